@@ -21,14 +21,11 @@ Press Ctrl+C to exit!
 i = 0
 scrollphat.set_brightness(20)
 
-cpu_values = [0] * 11
+cpu_graph = scrollphat.streaming_graph(low=0, high=25)
 
 while True:
     try:
-        cpu_values.pop(0)
-        cpu_values.append(psutil.cpu_percent())
-
-        scrollphat.graph(cpu_values, 0, 25)
+        cpu_graph.push(psutil.cpu_percent())
 
         time.sleep(0.2)
     except KeyboardInterrupt:
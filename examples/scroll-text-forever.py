@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 import sys
-import time
 
 import scrollphat
 
@@ -20,12 +19,10 @@ Usage: {} "message"
     sys.exit(0)
 
 scrollphat.set_brightness(2)
-scrollphat.write_string(sys.argv[1], 11)
-
-while True:
-    try:
-        scrollphat.scroll()
-        time.sleep(0.1)
-    except KeyboardInterrupt:
-        scrollphat.clear()
-        sys.exit(-1)
+
+# scroll at a steady 10 columns per second, however long each update takes
+try:
+    scrollphat.scroll_text(sys.argv[1], columns_per_second=10, loop=True)
+except KeyboardInterrupt:
+    scrollphat.clear()
+    sys.exit(-1)
@@ -17,49 +17,20 @@ import scrollphat
 #   u,d,l,r - arrows (up down left and right respectively)
 # -------------------------------------------------------------------------------
 
-try:
-    from PIL import Image
-except ImportError:
-    exit("This script requires the pillow module\nInstall with: sudo pip install pillow")
+from scrollphat.fonts import from_image
 
 
 # -----------------------------------------------------------------------------
-# This funtion will read the supplied image
-# and convert it into font data for Scoll pHAT.
+# The font image is read with scrollphat.fonts.from_image(), which
+# converts it and caches the result, so later runs load instantly.
 # The expect format of the image is as follows:
 # Each font image contains a 16 x 6 table of squares,
 # one for each ASCII character, starting with a space (0x20) and
 #  incrementing from left to right. Each square is 6x6 box
 # boarding the 5x5 image of the individual characters.
 def convert_png2font(font_file):
-
-    font = {}
     font_path = os.path.join(os.path.dirname(__file__), font_file)
-    font_image = Image.open(font_path)
-
-    char = 0x20
-    gridsize_x = 16
-    gridsize_y = 6
-    border = 1
-    for char_y in range(0, gridsize_y):
-        for char_x in range(0, gridsize_x):
-            char_bits = []
-            for x in range(0, 5):
-                bits = 0
-                for y in range(0, 5):
-                    pixel = font_image.getpixel((border + (char_x * 6) + x, border + (char_y * 6) + y))
-                    if pixel == 1:
-                        bits |= (1 << y)
-                char_bits.append(bits)
-
-            # remove all "empty" columns from the right of the character
-            while len(char_bits) > 0 and char_bits[-1] == 0:
-                char_bits.pop()
-
-            font[char] = char_bits
-
-            char += 1
-    return font
+    return from_image(font_path, columns=16, rows=6, border=1, ink=1)
 # -----------------------------------------------------------------------------
 
 
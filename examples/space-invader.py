@@ -52,6 +52,22 @@ DEFAULT_PAUSE_SHOW = 5
 
 DEFAULT_SCROLL_DISTANCE = 11
 
+# both frames of the space invader, packed once into column bytes
+INVADER = scrollphat.Sprite.from_art(
+    ['..#....#..',
+     '...####...',
+     '##########',
+     '#.#....#.#',
+     '..##..##..'],
+    ['..#....#..',
+     '#..####..#',
+     '##########',
+     '..#....#..',
+     '.##....##.'],
+)
+ARMS_DOWN = 0
+ARMS_UP = 1
+
 
 class SpaceInvader(object):
     '''Class with functions to display the space-invader figure'''
@@ -59,59 +75,6 @@ class SpaceInvader(object):
     def __init__(self, args):
         self.args = args
 
-    def armDownColumn(self, columnNumber, position):
-        '''Sets the columns for when it has the arms up'''
-
-        if self.args.verbose:
-            print('Running SpaceInvader.armUpDown, columnNumber: %s, position: %s' % (columnNumber, position))
-
-        if columnNumber == 0:
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-
-        elif columnNumber == 1:
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 2:
-            scrollphat.set_pixel(position, 0, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 3:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 4:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 5:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 6:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 7:
-            scrollphat.set_pixel(position, 0, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 8:
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 9:
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-
-        else:
-            print('armDownColumn input error: %s' % columnNumber)
-
     def armDownDisplay(self, position):
         '''Displays the space invader from parsed position with arms down'''
 
@@ -121,89 +84,18 @@ class SpaceInvader(object):
         if position > 6:
             print('Position too big to display setPositionCenter; MAX = 4')
         else:
-            self.armDownColumn(0, position)
-            self.armDownColumn(1, position + 1)
-            self.armDownColumn(2, position + 2)
-            self.armDownColumn(3, position + 3)
-            self.armDownColumn(4, position + 4)
-            self.armDownColumn(5, position + 5)
-            self.armDownColumn(6, position + 6)
-            self.armDownColumn(7, position + 7)
-            self.armDownColumn(8, position + 8)
-            self.armDownColumn(9, position + 9)
-
-    def armUpColumn(self, columnNumber, position):
-        '''Sets the columns for when it has the arms down'''
-
-        if self.args.verbose:
-            print('Running SpaceInvader.armUpDown, columnNumber: %s, position: %s' % (columnNumber, position))
-
-        if columnNumber == 0:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 1:
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 2:
-            scrollphat.set_pixel(position, 0, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 3:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 4:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 5:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 6:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        elif columnNumber == 7:
-            scrollphat.set_pixel(position, 0, 1)
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 3, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 8:
-            scrollphat.set_pixel(position, 2, 1)
-            scrollphat.set_pixel(position, 4, 1)
-
-        elif columnNumber == 9:
-            scrollphat.set_pixel(position, 1, 1)
-            scrollphat.set_pixel(position, 2, 1)
-
-        else:
-            print('armDownColumn input error: {}'.format(columnNumber))
+            scrollphat.draw_sprite(INVADER, position, ARMS_DOWN, mode='or')
 
     def armUpDisplay(self, position):
         '''Displays the space invader from parsed position with arms up'''
 
         if self.args.verbose:
-            print('Running SpaceInvader.armDownDisplay, position: {}'.format(position))
+            print('Running SpaceInvader.armUpDisplay, position: {}'.format(position))
 
         if position > 6:
             print('Position too big to display setPositionCenter; MAX = 4')
         else:
-            self.armUpColumn(0, position)
-            self.armUpColumn(1, position + 1)
-            self.armUpColumn(2, position + 2)
-            self.armUpColumn(3, position + 3)
-            self.armUpColumn(4, position + 4)
-            self.armUpColumn(5, position + 5)
-            self.armUpColumn(6, position + 6)
-            self.armUpColumn(7, position + 7)
-            self.armUpColumn(8, position + 8)
-            self.armUpColumn(9, position + 9)
+            scrollphat.draw_sprite(INVADER, position, ARMS_UP, mode='or')
 
     def dance(self):
         '''Displays the space invader dancing'''
@@ -290,54 +182,10 @@ class SpaceInvader(object):
         if self.args.verbose:
             print('Running SpaceInvader.scrollInSteps, stepNumber: {}'.format(stepNumber))
 
-        # Arm Down
-        if stepNumber == 1:
-            self.armDownColumn(0, 10)
-
-        # Arm Up
-        elif stepNumber == 2:
-            for i in range(0, 2):
-                self.armUpColumn(i, i + 9)
-
-        # Arm Down
-        elif stepNumber == 3:
-            for i in range(0, 3):
-                self.armDownColumn(i, i + 8)
-
-        # Arm Up
-        if stepNumber == 4:
-            for i in range(0, 4):
-                self.armUpColumn(i, i + 7)
-
-        # Arm Down
-        elif stepNumber == 5:
-            for i in range(0, 5):
-                self.armDownColumn(i, i + 6)
-
-        # Arm Up
-        if stepNumber == 6:
-            for i in range(0, 6):
-                self.armUpColumn(i, i + 5)
-
-        # Arm Down
-        elif stepNumber == 7:
-            for i in range(0, 7):
-                self.armDownColumn(i, i + 4)
-
-        # Arm Up
-        if stepNumber == 8:
-            for i in range(0, 8):
-                self.armUpColumn(i, i + 3)
-
-        # Arm Down
-        elif stepNumber == 9:
-            for i in range(0, 9):
-                self.armDownColumn(i, i + 2)
-
-        # Arm Up
-        elif stepNumber == 10:
-            for i in range(0, 10):
-                self.armUpColumn(i, i + 1)
+        # arms down on odd steps, up on even ones; the part
+        # of the sprite past the right edge is clipped off
+        frame = ARMS_DOWN if stepNumber % 2 else ARMS_UP
+        scrollphat.draw_sprite(INVADER, DEFAULT_SCROLL_DISTANCE - stepNumber, frame, mode='or')
 
         scrollphat.update()
         time.sleep(self.args.pause_scroll)
@@ -349,49 +197,9 @@ class SpaceInvader(object):
         if self.args.verbose:
             print('Running SpaceInvader.scrollOutSteps, stepNumber: {}'.format(stepNumber))
 
-        # Arm Up
-        if stepNumber == 1:
-            for i in range(1, 10):
-                self.armUpColumn(i, i - 1)
-
-        # Arm Down
-        elif stepNumber == 2:
-            for i in range(2, 10):
-                self.armDownColumn(i, i - 2)
-
-        # Arm Up
-        elif stepNumber == 3:
-            for i in range(3, 10):
-                self.armUpColumn(i, i - 3)
-
-        # Arm Down
-        elif stepNumber == 4:
-            for i in range(4, 10):
-                self.armDownColumn(i, i - 4)
-
-        # Arm Up
-        elif stepNumber == 5:
-            for i in range(5, 10):
-                self.armUpColumn(i, i - 5)
-
-        # Arm Down
-        elif stepNumber == 6:
-            for i in range(6, 10):
-                self.armDownColumn(i, i - 6)
-
-        # Arm Up
-        elif stepNumber == 7:
-            for i in range(7, 10):
-                self.armUpColumn(i, i - 7)
-
-        # Arm Down
-        elif stepNumber == 8:
-            for i in range(8, 10):
-                self.armDownColumn(i, i - 8)
-
-        # Arm Up
-        elif stepNumber == 9:
-            self.armUpColumn(9, 0)
+        # arms up on odd steps, down on even ones, clipped at the left edge
+        frame = ARMS_UP if stepNumber % 2 else ARMS_DOWN
+        scrollphat.draw_sprite(INVADER, -stepNumber, frame, mode='or')
 
         scrollphat.update()
         time.sleep(self.args.pause_scroll)
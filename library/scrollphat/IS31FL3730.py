@@ -1,65 +1,421 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import ModuleType
+
+from .backends import SMBusBackend
+from .graph import downsample
+from .shader import render_pixels
+from .stats import HELD_OFF, FrameStats, monotonic
+
 MODE_5X11 = 0b00000011
 
+# matrix size and display mode fields of the configuration
+# register; combine one of each, eg: DISPLAY_BOTH | MATRIX_8X8
+MATRIX_8X8 = 0b00
+MATRIX_7X9 = 0b01
+MATRIX_6X10 = 0b10
+MATRIX_5X11 = 0b11
+DISPLAY_MATRIX1 = 0b00000
+DISPLAY_MATRIX2 = 0b01000
+DISPLAY_BOTH = 0b11000
+
+# rows and columns of each matrix size
+MATRIX_SIZES = {
+    MATRIX_8X8: (8, 8),
+    MATRIX_7X9: (7, 9),
+    MATRIX_6X10: (6, 10),
+    MATRIX_5X11: (5, 11),
+}
+
+# number of rendered strings write_string() keeps around
+STRIP_CACHE_SIZE = 32
+
+# 5-bit reversal of every possible column byte, used to flip
+# the display vertically when rotated 180 degrees. Bits above
+# the bottom row are dropped, as rotate5bits() always has.
+ROTATE5 = [int('{:05b}'.format(x & 0x1f)[::-1], 2) for x in range(256)]
+ROTATE5_TABLE = bytes(bytearray(ROTATE5))
+
+# the same reversal for each matrix height
+ROTATE_TABLES = dict((rows, bytes(bytearray(int('{:0{}b}'.format(x & ((1 << rows) - 1), rows)[::-1], 2) for x in range(256))))
+                     for rows, columns in MATRIX_SIZES.values())
+
 class I2cConstants:
     def __init__(self):
         self.I2C_ADDR = 0x60
         self.CMD_SET_MODE = 0x00
         self.CMD_SET_BRIGHTNESS = 0x19
+        self.CMD_SET_COLUMN = 0x01
+        self.CMD_UPDATE = 0x0C
+        self.CMD_SET_COLUMN_MATRIX2 = 0x0E
+        self.CMD_RESET = 0xFF
         self.MODE_5X11 = 0b00000011
 
 class IS31FL3730:
-    def __init__(self, smbus, font):
-        self.bus = smbus
+    # smbus may be None to import it on first use, and font may be
+    # None to load the built-in font the first time text is written.
+    # bus is either an I2C bus number, or a backend providing
+    # write_i2c_block_data (see backends.py). Nothing touches the
+    # bus until the first write. mode sets the matrix size and
+    # which matrices are driven, see set_mode().
+    def __init__(self, smbus, font, bus=1, address=None, mode=MODE_5X11):
+        self.smbus = smbus
         self.font = font
+        self.bus_number = bus
         self.i2cConstants = I2cConstants()
+        if address is not None:
+            self.i2cConstants.I2C_ADDR = address
         self._rotate = False
 
-        self.bus = self.bus.SMBus(1)
-        self.buffer = [0] * 11
+        self._bus = None
+        self.buffer = bytearray()
+        self.window = bytearray()
         self.offset = 0
+        self._front = None
         self.error_count = 0
-        self.set_mode(self.i2cConstants.MODE_5X11)
+        self.sent_count = 0
+        self.skipped_count = 0
+        self.held_off_count = 0
+        self._last_frame = None
+        self._strip_cache = OrderedDict()
+        self._held = 0
+        self._batch_depth = 0
+        self.stats = None
+        self.reinit_count = 0
+        self._sent_brightness = None
+        self._failures = 0
+        self._holdoff_until = 0
+        self._retry_timer = None
+        self.set_retry()
+        self.lock = threading.RLock()
+        self.bus_lock = threading.RLock()
+        self._apply_mode(mode)
+
+    def _apply_mode(self, mode):
+        rows, columns = MATRIX_SIZES[mode & 0b11]
+        display = mode & DISPLAY_BOTH
+        if display == DISPLAY_BOTH:
+            registers = [self.i2cConstants.CMD_SET_COLUMN, self.i2cConstants.CMD_SET_COLUMN_MATRIX2]
+        elif display == DISPLAY_MATRIX2:
+            registers = [self.i2cConstants.CMD_SET_COLUMN_MATRIX2]
+        else:
+            registers = [self.i2cConstants.CMD_SET_COLUMN]
+
+        with self.lock:
+            self.mode = mode
+            self.height = rows
+            self.columns = columns
+            # with both matrices, matrix 1 is on the left
+            self.width = columns * len(registers)
+            self._matrix_registers = registers
+            self._rotate_table = ROTATE_TABLES[rows]
+            # column values for a bar of each height, filled from the bottom
+            self._bars = [((1 << rows) - 1) ^ ((1 << (rows - h)) - 1) for h in range(rows + 1)]
+            if len(self.window) != self.width:
+                self.window = bytearray(self.width)
+            if len(self.buffer) < self.width:
+                self.buffer.extend(bytearray(self.width - len(self.buffer)))
+            self._last_frame = None
+
+    @property
+    def bus(self):
+        if self._bus is None:
+            self._open()
+        return self._bus
+
+    def _open(self):
+        with self.bus_lock:
+            if self._bus is not None:
+                return
+
+            if isinstance(self.bus_number, int):
+                self._bus = SMBusBackend(self.bus_number, self.smbus)
+            else:
+                self._bus = self.bus_number
+
+            self.set_mode(self.mode)
 
     def set_rotate(self, value):
         self._rotate = value
 
     def rotate5bits(self, x):
-        r = 0
-        if x & 16:
-            r = r | 1
-        if x & 8:
-            r = r | 2
-        if x & 4:
-            r = r | 4
-        if x & 2:
-            r = r | 8
-        if x & 1:
-            r = r | 16
-        return r
+        return ROTATE5[x & 0xff]
+
+    def _fill_window(self):
+        # copy the visible columns into the reusable window,
+        # wrapping around the end of the buffer when necessary
+        window = self.window
+        width = self.width
+        if self._front is None:
+            buffer, offset = self.buffer, self.offset
+        else:
+            buffer, offset = self._front
+        length = len(buffer)
 
-    def update(self):
-        if self.offset + 11 <= len(self.buffer):
-            self.window = self.buffer[self.offset:self.offset + 11]
+        view = memoryview(buffer)
+        if offset + width <= length:
+            window[:] = view[offset:offset + width]
         else:
-            self.window = self.buffer[self.offset:]
-            self.window += self.buffer[:11 - len(self.window)]
+            # set_buffer() leaves the offset alone, so it may be past
+            # the end of a shorter buffer; show from the start then
+            head = max(length - offset, 0)
+            tail = min(width - head, length)
+            window[:head] = view[offset:]
+            window[head:head + tail] = view[:tail]
+            for i in range(head + tail, width):
+                window[i] = 0
 
         if self._rotate:
-            self.window.reverse()
-            for i in range(len(self.window)):
-                self.window[i] = self.rotate5bits(self.window[i])
+            window.reverse()
+            window[:] = window.translate(self._rotate_table)
 
-        self.window.append(0xff)
+        return window
+
+    def update(self):
+        # while held, something else (a frame pump or batch)
+        # is responsible for flushing the buffer
+        if self._held or self._batch_depth:
+            return
+
+        self.flush()
+
+    def flush(self):
+        stats = self.stats
+        if stats is None:
+            self._flush()
+        else:
+            started = monotonic()
+            sent = self._flush()
+            stats.record_update(monotonic() - started, sent)
+
+    def _flush(self):
+        # the buffer lock is only held while copying the window, so
+        # drawing can carry on while the frame is on the bus
+        with self.bus_lock:
+            # back off while the bus is unhealthy, rather than
+            # hammering it with every frame
+            now = monotonic()
+            if self._failures and now < self._holdoff_until:
+                self.held_off_count += 1
+                self._retry_later(self._holdoff_until - now)
+                return HELD_OFF
+
+            with self.lock:
+                # never show a batch that is only partly drawn
+                if self._batch_depth:
+                    return None
+
+                window = self._fill_window()
+
+                # skip the bus transaction if the device already shows this frame
+                if window == self._last_frame:
+                    self.skipped_count += 1
+                    return None
+
+                writes = self._plan_writes(window, self._last_frame)
+                # a bytearray, so _plan_writes() compares columns as ints on Python 2 too
+                sent = bytearray(window)
+
+            try:
+                for register, data in writes:
+                    self._write(register, data)
+            except IOError:
+                self._last_frame = None
+                self.error_count += 1
+                if self.error_count == 10:
+                    print("A high number of IO Errors have occurred, please check your soldering/connections.")
+                self._failed()
+                return False
+
+            self._failures = 0
+            self._last_frame = sent
+            self.sent_count += 1
+            return True
+
+    def _failed(self):
+        self._failures += 1
+        holdoff = self.holdoff * (2 ** (self._failures - 1))
+        self._holdoff_until = monotonic() + min(holdoff, self.max_holdoff)
+
+        # after a brown-out or hot-plug the chip is back in its reset
+        # state, so repeated failures restore it from cached settings
+        if self._failures % self.reinit_after == 0:
+            try:
+                self.reinit()
+            except IOError:
+                pass
+
+    # the frame drawn during holdoff is still pending, so flush it
+    # when the holdoff ends even if nothing calls update() again
+    def _retry_later(self, delay):
+        if self._retry_timer is None:
+            self._retry_timer = threading.Timer(delay, self._retry)
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _retry(self):
+        with self.bus_lock:
+            self._retry_timer = None
+        self.update()
+
+    def healthy(self):
+        return self._failures == 0
+
+    def set_retry(self, retries=2, backoff=0.001, max_backoff=0.02, reinit_after=5, holdoff=0.01, max_holdoff=1.0):
+        # retries and backoff apply to each bus write; after a frame
+        # fails, later frames are skipped for holdoff seconds, doubling
+        # with each failure up to max_holdoff, and every reinit_after
+        # failures the chip is reset and reinitialised
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reinit_after = reinit_after
+        self.holdoff = holdoff
+        self.max_holdoff = max_holdoff
+
+    def reinit(self):
+        with self.bus_lock:
+            self.reinit_count += 1
+            self._sent_brightness = None
+            self._write(self.i2cConstants.CMD_RESET, [0x00])
+            self.set_mode(self.mode)
+            if hasattr(self, 'brightness'):
+                self.set_brightness(self.brightness)
+
+    def _plan_writes(self, window, last_frame):
+        # only send the columns that changed since the last frame.
+        # Matrix 2 is written first, so that the update register
+        # written last latches both matrices at once. Matrix 1 data
+        # either runs on through to the update register, or is
+        # followed by a separate update write when that costs fewer
+        # bus bytes.
+        columns = self.columns
+        writes = []
+        updated = False
+
+        for matrix in reversed(range(len(self._matrix_registers))):
+            start = matrix * columns
+            first, end = 0, columns
+            if last_frame is not None:
+                while first < columns and window[start + first] == last_frame[start + first]:
+                    first += 1
+                if first == columns:
+                    continue
+                while window[start + end - 1] == last_frame[start + end - 1]:
+                    end -= 1
+
+            register = self._matrix_registers[matrix]
+            data = list(window[start + first:start + end])
+
+            if register == self.i2cConstants.CMD_SET_COLUMN:
+                # every transaction also costs an address and register byte,
+                # and running through means padding any unused data registers
+                padding = self.i2cConstants.CMD_UPDATE - register - columns
+                through = 2 + len(data) + (columns - end) + padding + 1
+                separate = 2 + len(data) + 2 + 1
+
+                if through <= separate:
+                    data.extend(window[start + end:start + columns])
+                    data.extend([0] * padding)
+                    data.append(0xff)
+                    updated = True
+
+            writes.append((register + first, data))
+
+        if not updated:
+            writes.append((self.i2cConstants.CMD_UPDATE, [0xff]))
+
+        return writes
+
+    def _write(self, register, data):
+        stats = self.stats
+        attempt = 0
+
+        while True:
+            started = monotonic()
+            try:
+                self.bus.write_i2c_block_data(self.i2cConstants.I2C_ADDR, register, data)
+            except IOError as e:
+                if stats is not None:
+                    stats.record_error(e)
+                if attempt >= self.retries:
+                    raise
+                if stats is not None:
+                    stats.record_retry()
+                time.sleep(min(self.backoff * (2 ** attempt), self.max_backoff))
+                attempt += 1
+                continue
+
+            if stats is not None:
+                stats.record_write(monotonic() - started, len(data))
+            return
+
+    def enable_stats(self, callback=None, interval=10.0):
+        self.stats = FrameStats(callback, interval)
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    # with double buffering, drawing goes to the back buffer (still
+    # self.buffer) and frames only show the front one, which swap()
+    # exchanges with the back without copying, along with the offset
+    def enable_double_buffer(self):
+        with self.lock:
+            if self._front is None:
+                self._front = (bytearray(self.buffer), self.offset)
+
+    def disable_double_buffer(self):
+        # carry on from the frame that was last published
+        with self.lock:
+            if self._front is not None:
+                self.buffer, self.offset = self._front
+                self._front = None
+
+    def swap(self):
+        # publish the back buffer; the new back buffer is the previous
+        # front, so redraw it in full before the next swap
+        with self.lock:
+            if self._front is None:
+                raise RuntimeError("Double buffering is not enabled")
+            front = self._front[0]
+            self._front = (self.buffer, self.offset % len(self.buffer))
+            self.buffer = front
+            if len(self.buffer) < self.width:
+                self.buffer.extend(bytearray(self.width - len(self.buffer)))
+        self.update()
+
+    def hold(self):
+        with self.lock:
+            self._held += 1
+
+    def release(self):
+        with self.lock:
+            self._held -= 1
+        self.update()
 
+    @contextmanager
+    def batch(self):
+        # draw several changes and show them as a single frame;
+        # nothing is flushed if the block raises
+        with self.lock:
+            self._batch_depth += 1
         try:
-            self.bus.write_i2c_block_data(self.i2cConstants.I2C_ADDR, 0x01, self.window)
-        except IOError:
-            self.error_count += 1
-            if self.error_count == 10:
-                print("A high number of IO Errors have occurred, please check your soldering/connections.")
+            yield self
+        finally:
+            with self.lock:
+                self._batch_depth -= 1
+        self.update()
 
     def set_mode(self, mode=MODE_5X11):
-        self.bus.write_i2c_block_data(self.i2cConstants.I2C_ADDR, self.i2cConstants.CMD_SET_MODE, [self.i2cConstants.MODE_5X11])
+        # mode is a MATRIX_ size combined with a DISPLAY_ mode,
+        # which sets the size of the window and the registers
+        # frames are written to
+        with self.bus_lock:
+            self._apply_mode(mode)
+            self._write(self.i2cConstants.CMD_SET_MODE, [mode])
 
     def get_brightness(self):
         if hasattr(self, 'brightness'):
@@ -68,62 +424,109 @@ class IS31FL3730:
 
     def set_brightness(self, brightness):
         self.brightness = brightness
-        self.bus.write_i2c_block_data(self.i2cConstants.I2C_ADDR, self.i2cConstants.CMD_SET_BRIGHTNESS, [self.brightness])
+        with self.bus_lock:
+            # fades set the same value many times in a row
+            if brightness == self._sent_brightness:
+                return
+            self._write(self.i2cConstants.CMD_SET_BRIGHTNESS, [self.brightness])
+            self._sent_brightness = brightness
 
     def set_col(self, x, value):
         if len(self.buffer) <= x:
-            self.buffer += [0] * (x - len(self.buffer) + 1)
+            # the buffer can't be resized while flush() is reading it
+            with self.lock:
+                self.buffer.extend(bytearray(x - len(self.buffer) + 1))
 
         self.buffer[x] = value
 
-    def write_string(self, chars, x = 0):
+    def render_string(self, chars):
+        # render a whole string into a strip of column bytes,
+        # remembering the most recently rendered strings so
+        # tickers that rewrite the same message cost nothing
+        if self.font is None:
+            from . import builtin_font
+            self.font = builtin_font()
+
+        key = (id(self.font), chars)
+        cached = self._strip_cache.pop(key, None)
+        if cached is not None and cached[0] is self.font:
+            self._strip_cache[key] = cached
+            return cached[1]
+
+        strip = bytearray()
         for char in chars:
-            if ord(char) == 0x20 or ord(char) not in self.font:
-                self.set_col(x, 0)
-                x += 1
-                self.set_col(x, 0)
-                x += 1
-                self.set_col(x, 0)
-                x += 1
+            font_char = self.font.get(ord(char)) if char != ' ' else None
+            if font_char is None:
+                strip += b'\x00\x00\x00'
             else:
-                font_char = self.font[ord(char)]
-                for i in range(0, len(font_char)):
-                    self.set_col(x, font_char[i])
-                    x += 1
+                strip += bytearray(font_char)
+                strip.append(0) # space between chars
+        strip = bytes(strip)
+
+        self._strip_cache[key] = (self.font, strip)
+        if len(self._strip_cache) > STRIP_CACHE_SIZE:
+            self._strip_cache.popitem(last=False)
 
-                self.set_col(x, 0)
-                x += 1 # space between chars
+        return strip
+
+    def write_string(self, chars, x = 0):
+        strip = self.render_string(chars)
+        end = x + len(strip)
+        with self.lock:
+            if len(self.buffer) < end:
+                self.buffer.extend(bytearray(end - len(self.buffer)))
+
+            self.buffer[x:end] = strip
         self.update()
 
     # draw a graph across the screen either using
     # the supplied min/max for scaling or auto
     # scaling the output to the min/max values
-    # supplied
-    def graph(self, values, low=None, high=None):
-        values = [float(x) for x in values]
+    # supplied. Series longer than the display (or
+    # columns) are reduced to one value per column
+    def graph(self, values, low=None, high=None, reduce='mean', columns=None):
+        values = downsample(values, columns or self.width, reduce)
+
+        if reduce == 'envelope':
+            lows, highs = values
+        else:
+            lows = highs = values
 
         if low == None:
-            low = min(values)
+            low = min(lows)
 
         if high == None:
-            high = max(values)
+            high = max(highs)
 
         span = high - low
 
-        for col, value in enumerate(values):
-            value -= low
-            value /= span
-            value *= 5
+        for col, value in enumerate(highs):
+            top = self._bar_height(value, low, span)
+            if reduce == 'envelope':
+                # light from the bucket's min up to its max, at least one row
+                bottom = min(self._bar_height(lows[col], low, span), self.height - 1)
+                bar = self._bars[max(top, bottom + 1)] ^ self._bars[bottom]
+            else:
+                bar = self._bars[top]
+            self.set_col(col, bar)
+
+        self.update()
 
-            if value > 5: value = 5
-            if value < 0: value = 0
+    # scale a value to a bar height between 0 and the matrix height,
+    # values above the low end of a flat (zero span) scale being full
+    def _bar_height(self, value, low, span):
+        if span <= 0:
+            return self.height if value > low else 0
 
-            self.set_col(col, [0,16,24,28,30,31][int(value)])
+        value = (value - low) / span * self.height
 
-        self.update()
+        if value > self.height: value = self.height
+        if value < 0: value = 0
+
+        return int(value)
 
     def set_buffer(self, replacement):
-        self.buffer = replacement
+        self.buffer = bytearray(replacement)
 
     def buffer_len(self):
         return len(self.buffer)
@@ -135,13 +538,20 @@ class IS31FL3730:
 
     def clear_buffer(self):
         self.offset = 0
-        self.buffer = [0] * 11
+        self.buffer = bytearray(self.width)
 
     def clear(self):
         self.clear_buffer()
         self.update()
 
     def load_font(self, new_font):
+        # the scrollphat.font module stands for the font it holds,
+        # since importing it shadows the scrollphat.font dictionary
+        if isinstance(new_font, (list, tuple)):
+            from .fonts import FontChain
+            new_font = FontChain(*[font.font if isinstance(font, ModuleType) else font for font in new_font])
+        elif isinstance(new_font, ModuleType):
+            new_font = new_font.font
         self.font = new_font
 
     def scroll_to(self, pos = 0):
@@ -152,8 +562,27 @@ class IS31FL3730:
     def io_errors(self):
         return self.error_count
 
+    def frames_sent(self):
+        return self.sent_count
+
+    def frames_skipped(self):
+        return self.skipped_count
+
+    def frames_held_off(self):
+        return self.held_off_count
+
     def set_pixel(self, x,y,value):
         if value:
             self.buffer[x] |= (1 << y)
         else:
             self.buffer[x] &= ~(1 << y)
+
+    def set_pixels(self, handler, auto_update=False):
+        columns = render_pixels(handler, self.width, self.height)
+        with self.lock:
+            if len(self.buffer) < self.width:
+                self.buffer.extend(bytearray(self.width - len(self.buffer)))
+            self.buffer[:self.width] = columns
+
+        if auto_update:
+            self.update()
@@ -1,15 +1,14 @@
-from sys import exit, version_info
+import sys
+from importlib import import_module
 
-try:
-    import smbus
-except ImportError:
-    if version_info[0] < 3:
-        raise ImportError("This library requires python-smbus\nInstall with: sudo apt-get install python-smbus")
-    elif version_info[0] == 3:
-        raise ImportError("This library requires python3-smbus\nInstall with: sudo apt-get install python3-smbus")
-
-from .font import font
-from .IS31FL3730 import IS31FL3730, I2cConstants
+from .IS31FL3730 import (IS31FL3730, I2cConstants, MODE_5X11, MATRIX_8X8, MATRIX_7X9, MATRIX_6X10, MATRIX_5X11,
+                         DISPLAY_MATRIX1, DISPLAY_MATRIX2, DISPLAY_BOTH)
+from .pump import FramePump
+from .fade import Fader
+from .backends import SMBusBackend, SimulatorBackend, RecorderBackend
+from .graph import StreamingGraph
+from .scroller import Scroller
+from .sprite import Sprite
 
 
 __version__ = '0.0.7'
@@ -18,15 +17,77 @@ ROTATE_OFF = False
 ROTATE_180 = True
 
 controller = None
+pump = None
+fader = None
+
+# smbus, the fonts and the device itself are only loaded when
+# first needed, so importing scrollphat is cheap and works on
+# machines without I2C
+_bus = 1
+_address = None
+_displays = None
+_mode = MODE_5X11
+
+def builtin_font():
+    """Return the built-in font dictionary, loading it on first use
+
+    scrollphat.font is the same dictionary.
+    """
+    global font
+
+    font = import_module('.font', __name__).font
+    return font
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # scrollphat.font is only loaded when first used
+        if name == 'font':
+            return builtin_font()
+        # as are compiled fonts, which need hashlib, mmap and unicodedata
+        if name in ('BinaryFont', 'FontChain'):
+            return getattr(import_module('.fonts', __name__), name)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+else:
+    from .fonts import BinaryFont, FontChain
+    builtin_font()
 
 def _get_controller():
     global controller
 
     if controller is None:
-        controller = IS31FL3730(smbus, font)
+        if _displays:
+            from .canvas import Canvas
+            controller = Canvas([IS31FL3730(None, None, bus, address, _mode) for bus, address in _displays])
+        else:
+            controller = IS31FL3730(None, None, _bus, _address, _mode)
 
     return controller
 
+def configure(bus=1, address=None, displays=None, mode=MODE_5X11):
+    """Choose how to reach Scroll pHAT
+
+    Must be called before any other function that uses Scroll pHAT.
+
+    To chain several displays into one long display, pass their buses and addresses
+    from left to right, for example::
+
+        scrollphat.configure(displays=[(1, 0x60), (1, 0x61), (3, 0x60)])
+
+    :param bus: I2C bus number, or a backend such as SimulatorBackend() to use instead of smbus (default 1)
+    :param address: I2C address of the display (default 0x60)
+    :param displays: List of (bus, address) pairs to use as one wide display, instead of bus and address
+    :param mode: Matrix size and layout for other IS31FL3730 boards, eg: DISPLAY_BOTH | MATRIX_8X8 (default MODE_5X11)
+    """
+    global _bus, _address, _displays, _mode
+
+    if controller is not None:
+        raise RuntimeError("configure() must be called before Scroll pHAT is first used")
+
+    _bus = bus
+    _address = address
+    _displays = displays
+    _mode = mode
+
 def set_rotate(value):
     """Set the rotation of Scroll pHAT
 
@@ -45,6 +106,19 @@ def update():
 
     _get_controller().update()
 
+def batch():
+    """Group several changes into a single update of Scroll pHAT
+
+    Inside the block, functions that would normally update Scroll pHAT
+    only change the buffer; one update is made when the block ends::
+
+        with scrollphat.batch():
+            scrollphat.clear_buffer()
+            scrollphat.write_string("Hi")
+            scrollphat.set_pixel(10, 4, 1)
+    """
+    return _get_controller().batch()
+
 def set_buffer(buf):
     """Overwrite the buffer
 
@@ -75,14 +149,33 @@ def write_string( chars, x = 0):
     """
     _get_controller().write_string(chars,x)
 
-def graph(values, low=None, high=None):
+def graph(values, low=None, high=None, reduce='mean', columns=None):
     """Write a bar graph to the buffer
 
-    :param values: List of values to display
+    Series longer than the display are split into one bucket per column,
+    each reduced to a single bar.
+
+    :param values: List, array or iterable of values to display
     :param low: Lowest possible value (default min(values))
     :param high: Highest possible value (default max(values))
+    :param reduce: How buckets are reduced, 'mean', 'max', 'last' or 'envelope'
+                   to draw each column from the bucket's min to its max (default 'mean')
+    :param columns: Number of columns to graph long series into (default the display width)
     """
-    _get_controller().graph(values, low, high)
+    _get_controller().graph(values, low, high, reduce, columns)
+
+def streaming_graph(size=None, low=None, high=None, x=0):
+    """Create a bar graph that samples are pushed onto one at a time
+
+    The graph keeps the last `size` samples, newest on the right, and only
+    redraws columns that change. Call push(value) on it to add a sample.
+
+    :param size: Number of samples to show (default the display width)
+    :param low: Value of an empty bar (default the lowest sample shown)
+    :param high: Value of a full bar (default the highest sample shown)
+    :param x: Buffer column of the oldest sample (default 0)
+    """
+    return StreamingGraph(_get_controller(), size, low, high, x)
 
 def buffer_len():
     """Returns the length of the internal buffer"""
@@ -92,7 +185,8 @@ def scroll(delta = 1):
     """Scroll the offset
 
     Scroll pHAT displays an 11 column wide window into the buffer,
-    which starts at the left offset.
+    which starts at the left offset. Chained displays show a window
+    11 columns wide for each display.
 
     :param delta: Amount to scroll (default 1)
     """
@@ -121,9 +215,32 @@ def load_font(new_font):
     1 is the top-most pixel (nearest the header) and 16 the bottom-most.
 
     A value of 17 would light the top and bottom pixels.
+
+    A compiled font, loaded with scrollphat.fonts.BinaryFont.open(), may be used in place
+    of a dictionary.
+
+    A list of fonts is chained, each character being taken from the first font
+    that has it, eg: [icons, BinaryFont.open('latin.bin'), scrollphat.font], scrollphat.font
+    being the built-in font (also returned by builtin_font()). See scrollphat.fonts.FontChain.
     """
     _get_controller().load_font(new_font)
 
+def scroll_text(text, columns_per_second=10, loop=False):
+    """Scroll a text string across Scroll pHAT at a steady speed
+
+    The position is taken from the clock, so slow updates drop columns
+    rather than slowing the text down. Blocks until the text has
+    scrolled past, or with loop=True until interrupted.
+
+    :param text: Text string to scroll
+    :param columns_per_second: Scrolling speed (default 10)
+    :param loop: Keep scrolling round the buffer (default False)
+    :return: Frame statistics, see scrollphat.scroller.Scroller
+    """
+    scroller = Scroller(_get_controller(), columns_per_second)
+    scroller.scroll_text(text, loop)
+    return scroller.stats()
+
 def scroll_to(pos = 0):
     """Set the internal offset to a specific position
 
@@ -135,6 +252,137 @@ def io_errors():
     """Return the internal count of IO Error events"""
     return _get_controller().io_errors()
 
+def frames_sent():
+    """Return the number of frames actually written to Scroll pHAT"""
+    return _get_controller().frames_sent()
+
+def frames_skipped():
+    """Return the number of updates skipped because the frame had not changed"""
+    return _get_controller().frames_skipped()
+
+def frames_held_off():
+    """Return the number of updates held back while recovering from I2C errors
+
+    The latest of these frames is sent once the holdoff period ends.
+    """
+    return _get_controller().frames_held_off()
+
+def start_pump(fps=30):
+    """Refresh Scroll pHAT from a background thread
+
+    While the pump is running, update() and the functions that call
+    it only change the buffer; the pump writes it to Scroll pHAT at
+    a steady rate, so your code never waits on the I2C bus.
+
+    :param fps: Target refresh rate in frames per second (default 30)
+    """
+    global pump
+
+    if pump is None:
+        pump = FramePump(_get_controller(), fps)
+        if fader is not None:
+            fader.attach(pump)
+        pump.start()
+
+    return pump
+
+def stop_pump():
+    """Stop the background refresh thread and display the final buffer"""
+    global pump
+
+    if pump is not None:
+        if fader is not None:
+            fader.detach()
+        pump.stop()
+        pump = None
+
+def _get_fader():
+    global fader
+
+    if fader is None:
+        fader = Fader(_get_controller())
+        if pump is not None:
+            fader.attach(pump)
+
+    return fader
+
+def fade_to(level, duration=1.0):
+    """Fade the brightness of Scroll pHAT in the background
+
+    Levels are gamma corrected, so a fade looks even to the eye. Steps
+    are taken by the frame pump if it is running, or by a timer thread.
+
+    :param level: Brightness to fade to: 0 to 255
+    :param duration: Length of the fade in seconds (default 1.0)
+    """
+    _get_fader().fade_to(level, duration)
+
+def pulse(period=1.0, low=0, high=255):
+    """Pulse the brightness of Scroll pHAT until stop_fade() is called
+
+    :param period: Seconds for one full pulse (default 1.0)
+    :param low: Dimmest brightness: 0 to 255 (default 0)
+    :param high: Brightest brightness: 0 to 255 (default 255)
+    """
+    _get_fader().pulse(period, low, high)
+
+def stop_fade():
+    """Stop any fade or pulse, leaving the brightness where it is"""
+    if fader is not None:
+        fader.stop()
+
+def enable_stats(callback=None, interval=10.0):
+    """Start recording frame rate and I2C bus statistics
+
+    :param callback: Optional function called with get_stats() every interval seconds
+    :param interval: Seconds between calls to callback (default 10)
+    """
+    _get_controller().enable_stats(callback, interval)
+
+def get_stats():
+    """Return the statistics recorded since enable_stats() as a dict, or None"""
+    stats = _get_controller().stats
+    if stats is None:
+        return None
+    return stats.as_dict()
+
+def enable_double_buffer():
+    """Draw off-screen and show whole frames with swap()
+
+    Drawing functions change a back buffer while Scroll pHAT keeps showing
+    the front buffer, so a frame is never seen half drawn, even when it is
+    refreshed from another thread.
+    """
+    _get_controller().enable_double_buffer()
+
+def disable_double_buffer():
+    """Go back to drawing straight to the displayed buffer, starting from the last swapped frame"""
+    _get_controller().disable_double_buffer()
+
+def swap():
+    """Show the back buffer and its scroll offset, and update Scroll pHAT
+
+    The buffers are exchanged rather than copied, so the new back buffer
+    holds the frame from before the last swap; redraw it before the next.
+    """
+    _get_controller().swap()
+
+def set_retry(retries=2, backoff=0.001, max_backoff=0.02, reinit_after=5, holdoff=0.01, max_holdoff=1.0):
+    """Configure how Scroll pHAT recovers from I2C errors
+
+    Each bus write is retried with a doubling delay. While writes keep
+    failing, updates are skipped for a doubling holdoff period, and the
+    display is reset and set up again after repeated failures.
+
+    :param retries: Times to retry a failed write (default 2)
+    :param backoff: Seconds to wait before the first retry (default 0.001)
+    :param max_backoff: Longest wait between retries (default 0.02)
+    :param reinit_after: Failed updates before resetting the display (default 5)
+    :param holdoff: Seconds to skip updates after a failed update (default 0.01)
+    :param max_holdoff: Longest time to skip updates for (default 1.0)
+    """
+    _get_controller().set_retry(retries, backoff, max_backoff, reinit_after, holdoff, max_holdoff)
+
 def set_pixel(x,y,value):
     """Turn a specific pixel on or off
 
@@ -144,6 +392,19 @@ def set_pixel(x,y,value):
     """
     _get_controller().set_pixel(x,y,value)
 
+def draw_sprite(sprite, x=0, frame=0, mode='copy', mirror=False):
+    """Draw a frame of a sprite into the buffer
+
+    Call update() to show it.
+
+    :param sprite: A scrollphat.Sprite
+    :param x: Buffer column of the sprite's left edge, may be negative to clip it
+    :param frame: Index of the frame to draw (default 0)
+    :param mode: 'copy', 'or', 'and_not' or 'xor' (default 'copy')
+    :param mirror: Draw the frame flipped left to right (default False)
+    """
+    sprite.draw(_get_controller(), x, frame, mode, mirror)
+
 def set_pixels(handler, auto_update=False):
     """Use a pixel shader function to set 11x5 pixels
 
@@ -153,12 +414,10 @@ def set_pixels(handler, auto_update=False):
 
     Will display a check pattern.
 
+    If NumPy is installed, the handler is first tried once with arrays of every x and y
+    position, so handlers using plain arithmetic and comparisons are evaluated in bulk.
+
     :param handler: A function which accepts an x and y position, and returns True or False
     :param auto_update: Whether to update Scroll pHAT after setting all pixels (default False)    
     """
-    for x in range(11):
-        for y in range(5):
-            set_pixel(x, y, handler(x, y))
-
-    if auto_update:
-        update()
+    _get_controller().set_pixels(handler, auto_update)
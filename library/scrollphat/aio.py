@@ -0,0 +1,165 @@
+"""asyncio front end for Scroll pHAT
+
+Each coroutine changes the controller's buffer on the event loop and
+hands the bus write to a dedicated single-thread executor. Overlapping
+update requests are coalesced: while one frame is on the bus, any
+number of further requests are satisfied by a single follow-up write of
+the latest buffer.
+
+Requires Python 3.7 or later.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncScrollPhat:
+    """Wraps an IS31FL3730 controller for use from asyncio code
+
+    The controller is held for the lifetime of this object, so its
+    own update() calls only change the buffer; call close() to hand
+    it back to synchronous code.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.controller.hold()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrollphat-aio")
+        self._pending = None
+        self._flushing = None
+
+    async def update(self):
+        """Write the buffer to Scroll pHAT without blocking the event loop"""
+        pending = self._pending
+        if pending is None:
+            pending = self._pending = asyncio.ensure_future(self._flush(self._flushing))
+
+        # shield, so one cancelled caller doesn't cancel the
+        # write that other callers are waiting on
+        await asyncio.shield(pending)
+
+    async def _flush(self, previous):
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        # requests made from here on need a newer frame than this one
+        self._flushing = self._pending
+        self._pending = None
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.controller.flush)
+
+    async def scroll(self, delta=1):
+        """Scroll the offset and update Scroll pHAT"""
+        self.controller.scroll(delta)
+        await self.update()
+
+    async def graph(self, values, low=None, high=None, reduce='mean', columns=None):
+        """Write a bar graph to the buffer and update Scroll pHAT"""
+        self.controller.graph(values, low, high, reduce, columns)
+        await self.update()
+
+    async def scroll_text(self, text, delay=0.1):
+        """Scroll a text string across Scroll pHAT once
+
+        The position follows the loop's clock, so a busy loop or slow
+        bus drops columns rather than slowing the text down.
+
+        :param text: Text string to scroll
+        :param delay: Seconds between each one column step (default 0.1)
+        """
+        self.controller.clear_buffer()
+        self.controller.write_string(text, self.controller.width)
+
+        loop = asyncio.get_running_loop()
+        columns = self.controller.buffer_len() - self.controller.width
+        start = loop.time()
+        shown = 0
+
+        while shown < columns:
+            await asyncio.sleep(start + (shown + 1) * delay - loop.time())
+            position = min(int((loop.time() - start) / delay), columns)
+            if position > shown:
+                await self.scroll(position - shown)
+                shown = position
+
+    async def animate(self, frame, fps=10):
+        """Run an animation until it finishes or the task is cancelled
+
+        :param frame: Called with the frame number before each update; may be a
+            coroutine function. Returning False ends the animation.
+        :param fps: Target frames per second (default 10)
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / fps
+        deadline = loop.time()
+        count = 0
+
+        while True:
+            result = frame(count)
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result is False:
+                break
+
+            await self.update()
+            count += 1
+
+            deadline = max(deadline + interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+
+    def close(self):
+        """Stop the executor and return the controller to synchronous use"""
+        self._executor.shutdown(wait=True)
+        self.controller.release()
+
+
+_display = None
+
+def _get_display():
+    global _display
+
+    if _display is None:
+        from . import _get_controller
+        _display = AsyncScrollPhat(_get_controller())
+
+    return _display
+
+async def update():
+    """Update Scroll pHAT with the current buffer"""
+    await _get_display().update()
+
+async def scroll(delta=1):
+    """Scroll the offset and update Scroll pHAT
+
+    :param delta: Amount to scroll (default 1)
+    """
+    await _get_display().scroll(delta)
+
+async def graph(values, low=None, high=None, reduce='mean', columns=None):
+    """Write a bar graph to the buffer and update Scroll pHAT
+
+    :param values: List, array or iterable of values to display
+    :param low: Lowest possible value (default min(values))
+    :param high: Highest possible value (default max(values))
+    :param reduce: How buckets are reduced, 'mean', 'max', 'last' or 'envelope'
+                   to draw each column from the bucket's min to its max (default 'mean')
+    :param columns: Number of columns to graph long series into (default the display width)
+    """
+    await _get_display().graph(values, low, high, reduce, columns)
+
+async def scroll_text(text, delay=0.1):
+    """Scroll a text string across Scroll pHAT once
+
+    :param text: Text string to scroll
+    :param delay: Seconds between each one column step (default 0.1)
+    """
+    await _get_display().scroll_text(text, delay)
+
+async def animate(frame, fps=10):
+    """Run an animation until it finishes or the task is cancelled
+
+    :param frame: Called with the frame number before each update
+    :param fps: Target frames per second (default 10)
+    """
+    await _get_display().animate(frame, fps)
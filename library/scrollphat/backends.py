@@ -0,0 +1,186 @@
+"""Transports that IS31FL3730 can write to
+
+Any object providing write_i2c_block_data(addr, register, data) can
+be passed as the controller's bus. This module provides the real
+SMBus transport plus two that need no hardware: a simulator which
+decodes the chip's registers into a frame history, and a recorder
+which streams every transaction to a file or pipe for later replay.
+"""
+
+import struct
+import time
+from collections import deque
+from sys import version_info
+
+try:
+    monotonic = time.monotonic
+except AttributeError:
+    monotonic = time.time
+
+REG_MODE = 0x00
+REG_MATRIX1 = 0x01
+REG_UPDATE = 0x0C
+REG_MATRIX2 = 0x0E
+REG_BRIGHTNESS = 0x19
+
+RECORDING_MAGIC = b'SPHR\x01'
+# rows and columns for each matrix size in the mode register
+MATRIX_SIZES = [(8, 8), (7, 9), (6, 10), (5, 11)]
+
+# seconds since recording started, address, register, data length
+RECORD_HEADER = struct.Struct('<dBBB')
+
+def _import_smbus():
+    try:
+        import smbus
+    except ImportError:
+        if version_info[0] < 3:
+            raise ImportError("This library requires python-smbus\nInstall with: sudo apt-get install python-smbus")
+        elif version_info[0] == 3:
+            raise ImportError("This library requires python3-smbus\nInstall with: sudo apt-get install python3-smbus")
+
+    return smbus
+
+
+class SMBusBackend:
+    """Writes to a real I2C bus through smbus
+
+    :param bus: I2C bus number (default 1)
+    :param smbus: Module providing SMBus, imported on first use if None
+    """
+
+    def __init__(self, bus=1, smbus=None):
+        if smbus is None:
+            smbus = _import_smbus()
+        self.bus = smbus.SMBus(bus)
+
+    def write_i2c_block_data(self, addr, register, data):
+        self.bus.write_i2c_block_data(addr, register, data)
+
+
+class SimulatorBackend:
+    """Decodes writes into register state and a history of frames
+
+    A frame is recorded each time the update column register is
+    written, as the chip latches its data registers at that point.
+    Frames hold the columns of each matrix the mode register enables,
+    matrix 1 first.
+
+    :param history: Maximum number of frames to keep, or None for all
+    """
+
+    def __init__(self, history=None):
+        self.registers = {}
+        self.frames = deque(maxlen=history)
+        self.writes = 0
+
+    def write_i2c_block_data(self, addr, register, data):
+        registers = self.registers.get(addr)
+        if registers is None:
+            registers = self.registers[addr] = bytearray(256)
+
+        registers[register:register + len(data)] = bytearray(data)
+        self.writes += 1
+
+        if register <= REG_UPDATE < register + len(data):
+            self.frames.append(self._latch(registers))
+
+    def _latch(self, registers):
+        mode = registers[REG_MODE]
+        rows, columns = MATRIX_SIZES[mode & 0b11]
+        display = mode & 0b11000
+        frame = b''
+        if display != 0b01000:
+            frame += bytes(registers[REG_MATRIX1:REG_MATRIX1 + columns])
+        if display in (0b01000, 0b11000):
+            frame += bytes(registers[REG_MATRIX2:REG_MATRIX2 + columns])
+        return frame
+
+    def rows(self, addr=0x60):
+        return MATRIX_SIZES[self.registers.get(addr, bytearray(256))[REG_MODE] & 0b11][0]
+
+    def frame(self):
+        """Return the columns most recently latched, or None"""
+        if self.frames:
+            return self.frames[-1]
+        return None
+
+    def brightness(self, addr=0x60):
+        return self.registers.get(addr, bytearray(256))[REG_BRIGHTNESS]
+
+    def render(self, frame=None, rows=None, addr=0x60):
+        """Return a frame as rows of '#' and '.' for inspection"""
+        if frame is None:
+            frame = self.frame() or b''
+        if rows is None:
+            rows = self.rows(addr)
+        frame = bytearray(frame)
+        return '\n'.join(''.join('#' if column & (1 << y) else '.' for column in frame) for y in range(rows))
+
+
+class RecorderBackend:
+    """Streams every transaction to a file or pipe
+
+    Each record is a RECORD_HEADER followed by the data bytes, after
+    a RECORDING_MAGIC file header. Writes can also be passed on to
+    another backend, for recording a session on real hardware.
+
+    :param stream: Path, or binary file-like object, to record to
+    :param backend: Optional backend to forward every write to
+    """
+
+    def __init__(self, stream, backend=None):
+        if isinstance(stream, str):
+            stream = open(stream, 'wb')
+        self.stream = stream
+        self.backend = backend
+        self._started = monotonic()
+        self.stream.write(RECORDING_MAGIC)
+
+    def write_i2c_block_data(self, addr, register, data):
+        if self.backend is not None:
+            self.backend.write_i2c_block_data(addr, register, data)
+
+        self.stream.write(RECORD_HEADER.pack(monotonic() - self._started, addr, register, len(data)))
+        self.stream.write(bytearray(data))
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+def read_recording(stream):
+    """Yield (seconds, addr, register, data) for each recorded write
+
+    :param stream: Path, or binary file-like object, to read from
+    """
+    if isinstance(stream, str):
+        stream = open(stream, 'rb')
+
+    if stream.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+        raise ValueError("Not a Scroll pHAT recording")
+
+    while True:
+        header = stream.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+
+        seconds, addr, register, length = RECORD_HEADER.unpack(header)
+        yield seconds, addr, register, list(bytearray(stream.read(length)))
+
+def replay(stream, backend, realtime=False):
+    """Send a recorded session to a backend
+
+    :param stream: Path, or binary file-like object, to read from
+    :param backend: Backend to write to, eg: a SimulatorBackend
+    :param realtime: Reproduce the original timing (default False)
+    """
+    started = monotonic()
+
+    for seconds, addr, register, data in read_recording(stream):
+        if realtime:
+            delay = seconds - (monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        backend.write_i2c_block_data(addr, register, data)
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2 without the futures backport writes buses in turn
+    ThreadPoolExecutor = None
+
+from .IS31FL3730 import IS31FL3730, MODE_5X11
+
+
+class Canvas(IS31FL3730):
+    """Treats several IS31FL3730 displays as one wide display
+
+    The displays are placed left to right, each showing the next
+    columns of a shared buffer, so text written to the canvas scrolls
+    straight from one display onto the next. Displays on different
+    buses are written in parallel, one worker thread per bus, where
+    concurrent.futures is available.
+
+    :param displays: IS31FL3730 controllers, or (bus, address) tuples
+    :param font: Font for write_string, or None for the built-in font
+    """
+
+    def __init__(self, displays, font=None):
+        self.displays = [display if isinstance(display, IS31FL3730) else IS31FL3730(None, None, *display)
+                         for display in displays]
+
+        IS31FL3730.__init__(self, None, font, bus=None, mode=self.displays[0].mode)
+
+        groups = OrderedDict()
+        for display in self.displays:
+            bus = display.bus_number
+            key = bus if isinstance(bus, int) else id(bus)
+            groups.setdefault(key, []).append(display)
+        self._groups = list(groups.values())
+
+        self._executor = None
+        if len(self._groups) > 1 and ThreadPoolExecutor is not None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self._groups), thread_name_prefix="scrollphat-canvas")
+
+    def _flush(self):
+        with self.bus_lock:
+            with self.lock:
+                if self._batch_depth:
+                    return None
+
+                window = self._fill_window()
+                if window == self._last_frame:
+                    self.skipped_count += 1
+                    return None
+
+                sent = bytes(window)
+
+            # each display keeps its own dirty tracking, partial
+            # writes and error recovery for its slice of the frame
+            start = 0
+            for display in self.displays:
+                with display.lock:
+                    display.offset = 0
+                    display.buffer[:] = sent[start:start + display.width]
+                start += display.width
+
+            if self._executor is None:
+                results = [self._flush_group(group) for group in self._groups]
+            else:
+                results = list(self._executor.map(self._flush_group, self._groups))
+
+            if not all(results):
+                self._last_frame = None
+                self.error_count += 1
+                return False
+
+            self._last_frame = sent
+            self.sent_count += 1
+            return True
+
+    def _flush_group(self, displays):
+        ok = True
+        for display in displays:
+            if display._flush() is False:
+                ok = False
+        return ok
+
+    def _apply_mode(self, mode):
+        IS31FL3730._apply_mode(self, mode)
+        with self.lock:
+            self.width = sum(display.width for display in self.displays)
+            self.window = bytearray(self.width)
+            if len(self.buffer) < self.width:
+                self.buffer.extend(bytearray(self.width - len(self.buffer)))
+
+    def set_mode(self, mode=MODE_5X11):
+        for display in self.displays:
+            display.set_mode(mode)
+        self._apply_mode(mode)
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+        for display in self.displays:
+            display.set_brightness(brightness)
+
+    def set_retry(self, *args, **kwargs):
+        IS31FL3730.set_retry(self, *args, **kwargs)
+        for display in self.displays:
+            display.set_retry(*args, **kwargs)
+
+    def reinit(self):
+        self._last_frame = None
+        for display in self.displays:
+            display.reinit()
+
+    def healthy(self):
+        return all(display.healthy() for display in self.displays)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,131 @@
+"""Gamma-corrected brightness fades and pulses
+
+Levels are perceptual, 0 to 255, and are mapped onto the PWM register
+through GAMMA_TABLE so that a linear fade looks linear. The register is
+only written when the mapped value changes, and the controller skips
+brightness writes that wouldn't change anything, so slow fades and the
+flat ends of a pulse cost no bus traffic.
+"""
+
+import math
+import threading
+
+from .pump import monotonic
+
+GAMMA = 2.2
+GAMMA_TABLE = [int(round(255 * (level / 255.0) ** GAMMA)) for level in range(256)]
+
+def perceived(brightness):
+    """Return the lowest perceptual level that maps to a register value"""
+    for level, value in enumerate(GAMMA_TABLE):
+        if value >= brightness:
+            return level
+    return 255
+
+
+class Fader:
+    """Steps a controller's brightness along a fade or pulse
+
+    Steps are taken by a frame pump, if attached, just before each
+    frame is flushed; otherwise a timer thread takes them at `rate`
+    per second, and exits when a fade completes.
+
+    :param controller: IS31FL3730 controller to fade
+    :param rate: Steps per second when not attached to a pump (default 50)
+    """
+
+    def __init__(self, controller, rate=50):
+        self.controller = controller
+        self.rate = rate
+        self._curve = None
+        self._pump = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def level(self):
+        brightness = self.controller.get_brightness()
+        if brightness < 0:
+            return None
+        return perceived(brightness)
+
+    def fade_to(self, level, duration=1.0):
+        """Fade to a perceptual level from 0 to 255 over duration seconds"""
+        start = self.level()
+        if start is None:
+            start = level
+        began = monotonic()
+
+        def curve(now):
+            progress = (now - began) / duration if duration > 0 else 1.0
+            if progress >= 1.0:
+                return level, True
+            return start + (level - start) * progress, False
+
+        self._set_curve(curve)
+
+    def pulse(self, period=1.0, low=0, high=255):
+        """Pulse smoothly between two perceptual levels until stopped"""
+        began = monotonic()
+
+        def curve(now):
+            phase = ((now - began) / period) % 1.0
+            return low + (high - low) * (1 - math.cos(2 * math.pi * phase)) / 2, False
+
+        self._set_curve(curve)
+
+    def stop(self):
+        self._curve = None
+
+    def busy(self):
+        return self._curve is not None
+
+    def step(self, now=None):
+        """Move to the current point of the fade, returning True while one is running"""
+        curve = self._curve
+        if curve is None:
+            return False
+
+        level, finished = curve(monotonic() if now is None else now)
+        self.controller.set_brightness(GAMMA_TABLE[min(max(int(round(level)), 0), 255)])
+
+        if finished and self._curve is curve:
+            self._curve = None
+        return not finished
+
+    def attach(self, pump):
+        self._pump = pump
+        pump.add_callback(self.step)
+
+    def detach(self):
+        if self._pump is not None:
+            self._pump.remove_callback(self.step)
+            self._pump = None
+            if self._curve is not None:
+                self._start_timer()
+
+    def _set_curve(self, curve):
+        self._curve = curve
+        if self._pump is None:
+            self._start_timer()
+
+    def _start_timer(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="scrollphat-fade")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        stop = threading.Event()
+        while True:
+            while self._pump is None and self.step():
+                stop.wait(interval)
+
+            # a fade started while this one finished saw a live
+            # thread and started none, so check again before exiting
+            with self._lock:
+                if self._pump is not None or self._curve is None:
+                    self._thread = None
+                    return
@@ -0,0 +1,335 @@
+"""Compiled binary fonts
+
+A compiled font is memory-mapped and each glyph is only turned into
+a list of columns the first time it is used, so loading a large font
+costs next to nothing. Fonts are compiled with save_font(), or from a
+font image with tools/mkfont.py --binary.
+
+from_image() converts a font image, a grid of glyph cells, in one pass
+over its pixels and keeps the compiled result in a cache directory, so
+loading the same image again skips both PIL and the conversion.
+
+FontChain combines several fonts, eg: an icon font, an extended Latin
+font and the built-in ASCII font, taking each character from the first
+font that has it.
+
+File layout, all integers little-endian:
+
+    header   b'SPHF', version (B), height (B), glyph count N (H)
+    index    N codepoints (I), in ascending order
+    offsets  N + 1 offsets into data (I); glyph i is data[offsets[i]:offsets[i + 1]]
+    data     column bytes of every glyph
+"""
+
+import mmap
+import os
+import struct
+import unicodedata
+from bisect import bisect_left
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    _unichr = unichr
+except NameError:
+    _unichr = chr
+
+MAGIC = b'SPHF'
+VERSION = 1
+HEADER = struct.Struct('<4sBBH')
+UINT32 = struct.Struct('<I')
+
+_image = None
+
+def _get_image():
+    global _image
+
+    if _image is None:
+        try:
+            from PIL import Image
+            _image = Image
+        except ImportError:
+            raise ImportError("Loading fonts from images requires the pillow module\nInstall with: sudo pip install pillow")
+
+    return _image
+
+def _cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'scrollphat')
+
+def save_font(font, path, height=5):
+    """Compile a font dictionary into a binary font file
+
+    :param font: Dictionary of column lists, keyed on character ordinal
+    :param path: File to write
+    :param height: Pixel height of the glyphs (default 5)
+    """
+    codepoints = sorted(font)
+    offsets = [0]
+    data = bytearray()
+    for codepoint in codepoints:
+        data += bytearray(font[codepoint])
+        offsets.append(len(data))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, height, len(codepoints)))
+        f.write(struct.pack('<{}I'.format(len(codepoints)), *codepoints))
+        f.write(struct.pack('<{}I'.format(len(offsets)), *offsets))
+        f.write(data)
+
+class _UInt32s:
+    # a little-endian array of unsigned ints read straight from the
+    # font data, so opening a font doesn't parse its whole index
+    def __init__(self, data, offset, count):
+        self._data = data
+        self._offset = offset
+        self._count = count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return UINT32.unpack_from(self._data, self._offset + 4 * i)[0]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+
+class BinaryFont(Mapping):
+    """A compiled font, usable anywhere a font dictionary is
+
+    :param data: Contents of a compiled font, see open() to map a file
+    """
+
+    def __init__(self, data):
+        if len(data) < HEADER.size:
+            raise ValueError("Not a compiled Scroll pHAT font")
+        magic, version, self.height, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compiled Scroll pHAT font")
+
+        index = HEADER.size
+        offsets = index + 4 * count
+        glyphs = offsets + 4 * (count + 1)
+
+        # a truncated file would otherwise fail later, and not with a ValueError
+        if len(data) < glyphs:
+            raise ValueError("Compiled font is truncated")
+        if UINT32.unpack_from(data, offsets)[0] != 0 or UINT32.unpack_from(data, glyphs - 4)[0] > len(data) - glyphs:
+            raise ValueError("Compiled font is truncated")
+
+        self._data = data
+        self._codepoints = _UInt32s(data, index, count)
+        self._offsets = _UInt32s(data, offsets, count + 1)
+        self._glyphs_start = glyphs
+        self._glyphs = {}
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a compiled font file"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __getitem__(self, codepoint):
+        glyph = self._glyphs.get(codepoint)
+        if glyph is not None:
+            return glyph
+
+        i = bisect_left(self._codepoints, codepoint)
+        if i == len(self._codepoints) or self._codepoints[i] != codepoint:
+            raise KeyError(codepoint)
+
+        start = self._glyphs_start
+        glyph = self._glyphs[codepoint] = list(bytearray(self._data[start + self._offsets[i]:start + self._offsets[i + 1]]))
+        return glyph
+
+    def __contains__(self, codepoint):
+        i = bisect_left(self._codepoints, codepoint)
+        return i < len(self._codepoints) and self._codepoints[i] == codepoint
+
+    def __iter__(self):
+        return iter(self._codepoints)
+
+    def __len__(self):
+        return len(self._codepoints)
+
+
+class FontChain(Mapping):
+    """Several fonts used as one, each character coming from the first font that has it
+
+    The codepoints of every font are indexed up front, which is cheap
+    for compiled fonts as only their index is read, and each character
+    is resolved once, so lookups cost the same however many fonts or
+    glyphs are chained. Glyphs are still only loaded when first used.
+
+    Characters no font has fall back to their unaccented form, so
+    '\xe9' is drawn as 'e' by an ASCII font, unless decompose is False.
+
+    :param fonts: Fonts to search, in order
+    :param decompose: Fall back to a character's base form (default True)
+    """
+
+    def __init__(self, *fonts, **kwargs):
+        self.fonts = fonts
+        self.decompose = kwargs.pop('decompose', True)
+        if kwargs:
+            raise TypeError("Unexpected argument {}".format(list(kwargs)[0]))
+
+        self.height = max([getattr(font, 'height', 5) for font in fonts] or [5])
+
+        self._index = {}
+        for font in reversed(fonts):
+            self._index.update(dict.fromkeys(font, font))
+        self._resolved = {}
+
+    def _resolve(self, codepoint):
+        font = self._index.get(codepoint)
+        if font is not None:
+            return font[codepoint]
+
+        if self.decompose:
+            base = unicodedata.normalize('NFKD', _unichr(codepoint))[0]
+            if ord(base) != codepoint:
+                return self.get(ord(base))
+
+        return None
+
+    def get(self, codepoint, default=None):
+        try:
+            glyph = self._resolved[codepoint]
+        except KeyError:
+            glyph = self._resolved[codepoint] = self._resolve(codepoint)
+        return default if glyph is None else glyph
+
+    def __getitem__(self, codepoint):
+        glyph = self.get(codepoint)
+        if glyph is None:
+            raise KeyError(codepoint)
+        return glyph
+
+    def __contains__(self, codepoint):
+        return self.get(codepoint) is not None
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+def convert_image(image, columns=16, rows=6, cell=(6, 6), border=0, height=5,
+                  width=5, ink=1, first=0x20, order='rows'):
+    """Convert a font image into a font dictionary
+
+    Arguments are as for from_image(), except that image must already
+    be loaded with PIL (or be anything with size and getdata()).
+    """
+    is_lit = ink
+    if not callable(ink):
+        # not ink.__eq__, which is NotImplemented (truthy) for tuple pixels
+        def is_lit(pixel):
+            return pixel == ink
+
+    image_width = image.size[0]
+    lit = [bool(is_lit(pixel)) for pixel in image.getdata()]
+
+    font = {}
+    for i in range(columns * rows):
+        if order == 'rows':
+            cx, cy = i % columns, i // columns
+        else:
+            cx, cy = i // rows, i % rows
+
+        left = cx * cell[0] + border
+        top = cy * cell[1] + border
+        char_bits = []
+        for x in range(left, left + width):
+            bits = 0
+            for y in range(height):
+                if lit[(top + y) * image_width + x]:
+                    bits |= 1 << y
+            char_bits.append(bits)
+
+        # remove all "empty" columns from the right of the character
+        while char_bits and char_bits[-1] == 0:
+            char_bits.pop()
+
+        font[first + i] = char_bits
+
+    return font
+
+def from_image(image, columns=16, rows=6, cell=(6, 6), border=0, height=5,
+               width=5, ink=1, first=0x20, order='rows', cache=True):
+    """Load a font from an image containing a grid of glyphs
+
+    Each glyph is read from a cell of the grid, starting with the
+    character `first` in the top-left cell, and has trailing blank
+    columns removed.
+
+    :param image: Path of the image file, or an image loaded with PIL
+    :param columns: Number of cells across the image
+    :param rows: Number of cells down the image
+    :param cell: (width, height) of each cell in pixels
+    :param border: Pixels to skip at the top-left of each cell
+    :param height: Pixel height of each glyph
+    :param width: Pixel width of each glyph, before trimming
+    :param ink: Pixel value of a lit pixel, or a function of the pixel
+                value returning True for lit pixels. Black ink in a
+                greyscale image is 0, a '1' bit image or palette index is 1
+    :param first: Ordinal of the first character
+    :param order: 'rows' if characters run left to right along each row,
+                  'columns' if they run down each column
+    :param cache: True to cache the converted font in ~/.cache/scrollphat,
+                  a directory to cache it there, or False to always convert
+
+    Caching keys on the image contents and the layout, so editing the
+    image or changing an argument is picked up. A function passed as ink
+    can't be part of the key, so fonts converted with one aren't cached.
+    """
+    layout = (columns, rows, tuple(cell), border, height, width, first, order)
+    if callable(ink):
+        cache = False
+    if cache is True:
+        cache = _cache_dir()
+
+    path = None
+    if cache:
+        import hashlib
+
+        key = hashlib.sha1(repr((layout, ink)).encode('utf-8'))
+        if isinstance(image, str):
+            with open(image, 'rb') as f:
+                key.update(f.read())
+        else:
+            key.update(repr((image.mode, image.size)).encode('utf-8'))
+            key.update(image.tobytes())
+        path = os.path.join(cache, key.hexdigest() + '.sphf')
+
+        # a missing or damaged entry is converted again and replaced
+        try:
+            return BinaryFont.open(path)
+        except (IOError, OSError, ValueError):
+            pass
+
+    if isinstance(image, str):
+        image = _get_image().open(image)
+
+    font = convert_image(image, columns, rows, cell, border, height, width, ink, first, order)
+
+    if path is not None:
+        # written alongside and renamed, so a reader never sees half a font
+        try:
+            if not os.path.isdir(cache):
+                os.makedirs(cache)
+            temp = '{}.{}'.format(path, os.getpid())
+            save_font(font, temp, height)
+            os.rename(temp, path)
+        except (IOError, OSError):
+            pass
+
+    return font
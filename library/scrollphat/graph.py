@@ -0,0 +1,216 @@
+"""Bar graph helpers
+
+downsample() reduces a long series to one value per display column,
+taking the mean, maximum, last value or min-max envelope of each
+bucket. With NumPy installed the buckets are reduced in a handful of
+vectorized calls, so an hour of per-second samples costs about the same
+as a screenful.
+
+A StreamingGraph keeps the last `size` samples in a ring and draws them
+as bars, newest on the right, scrolling left as samples are pushed.
+The running minimum and maximum are kept in monotonic deques, so
+autoscaling costs O(1) per sample, and only columns whose bar actually
+changes are written: usually just the new one, or more when the scale
+moves.
+"""
+
+from collections import deque
+
+from .shader import _get_numpy
+
+REDUCERS = ('mean', 'max', 'envelope', 'last')
+
+def downsample(values, columns, reduce='mean'):
+    """Reduce a series to at most `columns` values
+
+    The series is split into `columns` buckets of as even a size as
+    possible. Series no longer than `columns` are kept as they are.
+
+    :param values: List, array or iterable of numbers
+    :param columns: Number of values to reduce to
+    :param reduce: 'mean', 'max' or 'last' of each bucket, or 'envelope'
+                   for the min and max of each bucket
+    :return: A list of floats, or for 'envelope' a pair of lists (mins, maxes)
+    """
+    if reduce not in REDUCERS:
+        raise ValueError("reduce must be one of {}".format(', '.join(REDUCERS)))
+
+    numpy = _get_numpy()
+    if numpy:
+        return _downsample_vectorized(numpy, values, columns, reduce)
+
+    values = [float(x) for x in values]
+    count = len(values)
+    if count <= columns:
+        if reduce == 'envelope':
+            return values, list(values)
+        return values
+
+    edges = [i * count // columns for i in range(columns + 1)]
+    buckets = [values[edges[i]:edges[i + 1]] for i in range(columns)]
+
+    if reduce == 'mean':
+        return [sum(bucket) / len(bucket) for bucket in buckets]
+    if reduce == 'max':
+        return [max(bucket) for bucket in buckets]
+    if reduce == 'last':
+        return [bucket[-1] for bucket in buckets]
+    return [min(bucket) for bucket in buckets], [max(bucket) for bucket in buckets]
+
+def _downsample_vectorized(numpy, values, columns, reduce):
+    if isinstance(values, (list, tuple)) or hasattr(values, '__array__'):
+        values = numpy.asarray(values, dtype=float).ravel()
+    else:
+        values = numpy.fromiter(values, dtype=float)
+
+    count = len(values)
+    if count <= columns:
+        values = values.tolist()
+        if reduce == 'envelope':
+            return values, list(values)
+        return values
+
+    starts = numpy.arange(columns) * count // columns
+    if reduce == 'mean':
+        sizes = numpy.diff(numpy.append(starts, count))
+        return (numpy.add.reduceat(values, starts) / sizes).tolist()
+    if reduce == 'max':
+        return numpy.maximum.reduceat(values, starts).tolist()
+    if reduce == 'last':
+        return values[numpy.append(starts[1:], count) - 1].tolist()
+    return numpy.minimum.reduceat(values, starts).tolist(), numpy.maximum.reduceat(values, starts).tolist()
+
+
+class StreamingGraph:
+    """A bar graph of the most recent samples
+
+    :param controller: IS31FL3730 controller to draw on
+    :param size: Number of samples, and columns, to show (default the display width)
+    :param low: Value of an empty bar (default the lowest sample shown)
+    :param high: Value of a full bar (default the highest sample shown)
+    :param x: Buffer column of the oldest sample (default 0)
+    """
+
+    def __init__(self, controller, size=None, low=None, high=None, x=0):
+        self.controller = controller
+        self.size = size or controller.width
+        self.fixed_low = low
+        self.fixed_high = high
+        self.x = x
+        self.clear()
+
+    def clear(self):
+        """Forget every sample, leaving the graph's columns blank"""
+        self._ring = [0.0] * self.size
+        self._count = 0
+        self._mins = deque()
+        self._maxes = deque()
+        self._heights = [0] * self.size
+        self._scale = None
+        self._draw(list(range(self.size)))
+
+    @property
+    def values(self):
+        """The samples shown, oldest first"""
+        count = min(self._count, self.size)
+        start = self._count - count
+        return [self._ring[i % self.size] for i in range(start, self._count)]
+
+    @property
+    def low(self):
+        if self.fixed_low is not None:
+            return self.fixed_low
+        return self._mins[0][1] if self._mins else 0.0
+
+    @property
+    def high(self):
+        if self.fixed_high is not None:
+            return self.fixed_high
+        return self._maxes[0][1] if self._maxes else 0.0
+
+    def push(self, value):
+        """Add a sample, scrolling the graph one column left"""
+        self._append(value)
+        self._redraw()
+
+    def extend(self, values):
+        """Add several samples, drawing once"""
+        for value in values:
+            self._append(value)
+        self._redraw()
+
+    def _append(self, value):
+        value = float(value)
+        index = self._count
+        self._ring[index % self.size] = value
+        self._count += 1
+
+        expired = index - self.size
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((index, value))
+        if self._mins[0][0] <= expired:
+            self._mins.popleft()
+
+        while self._maxes and self._maxes[-1][1] <= value:
+            self._maxes.pop()
+        self._maxes.append((index, value))
+        if self._maxes[0][0] <= expired:
+            self._maxes.popleft()
+
+    def redraw(self):
+        """Draw every column again, eg: after the buffer was cleared"""
+        self._scale = None
+        self._redraw()
+
+    def _redraw(self):
+        controller = self.controller
+        low = self.low
+        span = self.high - low
+        scale = (low, span, controller.height)
+
+        # the old bars all move left by the number of new samples,
+        # the columns they leave are always drawn
+        shift = min(self._count - self._drawn, self.size)
+        fresh = self.size - shift
+        heights = self._heights[shift:] + [-1] * shift
+
+        # while the scale holds, old bars keep their height, and
+        # a new matrix height changes what every bar looks like
+        first = fresh if scale == self._scale else 0
+        if self._scale is None or scale[2] != self._scale[2]:
+            heights = [-1] * self.size
+        self._scale = scale
+
+        values = self.values
+        offset = self.size - len(values)
+        changed = []
+        for col in range(first, self.size):
+            if col < offset:
+                height = 0
+            else:
+                height = controller._bar_height(values[col - offset], low, span)
+            if height != heights[col]:
+                heights[col] = height
+                changed.append(col)
+
+        self._heights = heights
+        self._draw(changed, shift)
+
+    def _draw(self, changed, scrolled=0):
+        controller = self.controller
+        bars = controller._bars
+        x = self.x
+        end = x + self.size
+
+        with controller.lock:
+            buffer = controller.buffer
+            if len(buffer) < end:
+                buffer.extend(bytearray(end - len(buffer)))
+            if scrolled:
+                buffer[x:end - scrolled] = buffer[x + scrolled:end]
+            for col in changed:
+                buffer[x + col] = bars[self._heights[col]]
+
+        self._drawn = self._count
+        controller.update()
@@ -0,0 +1,197 @@
+"""Greyscale pixels through binary code modulation
+
+The IS31FL3730 can only turn each LED on or off, so greyscale is
+produced over time: a pixel's level is split into bit planes, and
+plane k is shown for 2**k time units of every refresh cycle. Planes
+are precomputed whenever show() is called, so the refresh thread only
+performs one full-frame write per plane (two in dual-matrix mode) and
+sleeps between them.
+
+Each cycle has 2**bits - 1 time units but only `bits` writes, so the
+bus limits the refresh rate. A 5x11 frame is 12 data bytes plus the
+address and register; at 9 bit times per byte plus start and stop
+that's 128 bit times per write, or about 780 writes per second on a
+100kHz bus and 3120 on a 400kHz bus, giving these refresh limits:
+
+    bits  writes/cycle  100kHz refresh  400kHz refresh
+    2     2             ~390 Hz         ~1560 Hz
+    3     3             ~260 Hz         ~1040 Hz
+    4     4             ~195 Hz         ~780 Hz
+
+Time units shrink as bits grow (a 4 bit cycle at 100Hz needs 0.67ms
+units), so in practice Python's timer resolution limits the depth
+before the bus does. bus_limit() computes the figures above for any
+controller, and measure_throughput() times the real write path, eg:
+against a SimulatorBackend to find Python's own limit. Measured that
+way with Python 3.11 on an x86-64 desktop, a 5x11 display sustained
+400,000 to 460,000 writes per second, and a dual-matrix one 230,000 to
+270,000, so there the bus is the only limit. A Pi Zero is much slower,
+so measure on the device itself.
+
+These work on single displays only: a Canvas has no bus of its own,
+so pass each of its displays instead.
+"""
+
+import os
+import threading
+import time
+
+from .canvas import Canvas
+from .pump import monotonic
+
+def _single(controller):
+    if isinstance(controller, Canvas):
+        raise TypeError("Greyscale needs a single display, pass one of canvas.displays instead of the Canvas")
+    return controller
+
+
+def bus_limit(controller, bus_hz=100000):
+    """Return the most full-frame writes per second a bus can carry"""
+    _single(controller)
+    writes = controller._plan_writes(bytearray(controller.width), None)
+    # each byte is 8 bits plus an ack, with a start and stop per transaction
+    bits = sum(9 * (2 + len(data)) + 2 for register, data in writes)
+    return float(bus_hz) / bits
+
+def measure_throughput(controller, seconds=1.0):
+    """Return how many full-frame writes per second controller sustains"""
+    _single(controller)
+    frames = [controller._plan_writes(bytearray([value]) * controller.width, None) for value in (0x00, 0xff)]
+    count = 0
+    started = monotonic()
+    while True:
+        for register, data in frames[count & 1]:
+            controller._write(register, data)
+        count += 1
+        elapsed = monotonic() - started
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+class GreyscaleDisplay:
+    """A greyscale framebuffer refreshed by a dedicated thread
+
+    Draw with set_pixel() and friends, then call show() to publish the
+    frame; the refresh thread keeps showing the previous frame until
+    then. The controller is held while running, so its own buffer is
+    not flushed over the greyscale frames.
+
+    :param controller: IS31FL3730 controller to drive
+    :param bits: Bits per pixel, giving 2**bits levels (default 2)
+    :param refresh: Full greyscale cycles per second (default 100)
+    """
+
+    def __init__(self, controller, bits=2, refresh=100):
+        self.controller = _single(controller)
+        self.bits = bits
+        self.levels = (1 << bits) - 1
+        self.refresh = refresh
+        self.width = controller.width
+        self.height = controller.height
+        self.pixels = bytearray(self.width * self.height)
+        self.cycles = 0
+        self.late = 0
+        self._schedule = []
+        self._thread = None
+        self._stop = threading.Event()
+        self.show()
+
+    def set_pixel(self, x, y, level):
+        """Set a pixel to a level from 0 (off) to self.levels (full)"""
+        self.pixels[x * self.height + y] = min(max(int(level), 0), self.levels)
+
+    def get_pixel(self, x, y):
+        return self.pixels[x * self.height + y]
+
+    def clear(self):
+        self.pixels = bytearray(self.width * self.height)
+
+    def planes(self):
+        """Return the column bytes of each bit plane, least significant first"""
+        planes = []
+        height = self.height
+        pixels = self.pixels
+        for bit in range(self.bits):
+            mask = 1 << bit
+            plane = bytearray(self.width)
+            for x in range(self.width):
+                column = 0
+                for y, level in enumerate(pixels[x * height:(x + 1) * height]):
+                    if level & mask:
+                        column |= 1 << y
+                plane[x] = column
+            planes.append(plane)
+        return planes
+
+    def show(self):
+        """Publish the pixels drawn so far to the refresh thread"""
+        controller = self.controller
+        schedule = []
+        for bit, plane in enumerate(self.planes()):
+            if controller._rotate:
+                plane.reverse()
+                plane = bytearray(plane.translate(controller._rotate_table))
+
+            units = 1 << bit
+            # planes that look the same are shown as one longer sub-frame
+            if schedule and schedule[-1][0] == plane:
+                schedule[-1] = (plane, schedule[-1][1] + units)
+            else:
+                schedule.append((plane, units))
+
+        # swapped in one assignment, so the thread never sees half a frame
+        self._schedule = [(controller._plan_writes(plane, None), units) for plane, units in schedule]
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self.controller.hold()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scrollphat-greyscale")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        # the device holds the last plane; show the ordinary buffer again
+        self.controller._last_frame = None
+        self.controller.release()
+
+    def running(self):
+        return self._thread is not None
+
+    def _run(self):
+        # best effort: real-time scheduling needs privileges
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(1))
+        except (AttributeError, OSError):
+            pass
+
+        controller = self.controller
+        unit = 1.0 / (self.refresh * self.levels)
+        deadline = monotonic()
+
+        while not self._stop.is_set():
+            for writes, units in self._schedule:
+                with controller.bus_lock:
+                    try:
+                        for register, data in writes:
+                            controller._write(register, data)
+                    except IOError:
+                        controller.error_count += 1
+
+                deadline += units * unit
+                delay = deadline - monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.late += 1
+                    deadline = monotonic()
+
+            self.cycles += 1
@@ -0,0 +1,87 @@
+import threading
+import time
+
+try:
+    monotonic = time.monotonic
+except AttributeError:
+    monotonic = time.time
+
+
+class FramePump:
+    """Flushes a controller's buffer to the device at a fixed rate
+
+    While running, the controller is held so that update() and the
+    methods which call it only touch the buffer; all bus traffic
+    happens on the pump's daemon thread.
+    """
+
+    def __init__(self, controller, fps=30):
+        self.controller = controller
+        self.fps = fps
+        self.frames = 0
+        self.late_frames = 0
+        self.frame_time = 0.0
+        self.callbacks = []
+        self._started = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self.controller.hold()
+        self._stop.clear()
+        self._started = monotonic()
+        self._thread = threading.Thread(target=self._run, name="scrollphat-pump")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.controller.release()
+
+    def add_callback(self, callback):
+        """Call callback() on the pump's thread just before each frame"""
+        self.callbacks = self.callbacks + [callback]
+
+    def remove_callback(self, callback):
+        self.callbacks = [c for c in self.callbacks if c != callback]
+
+    def running(self):
+        return self._thread is not None
+
+    def actual_fps(self):
+        """Return the average refresh rate achieved since start()"""
+        if self._started is None or self.frames == 0:
+            return 0.0
+
+        return self.frames / (monotonic() - self._started)
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        deadline = monotonic()
+
+        while not self._stop.is_set():
+            start = monotonic()
+            for callback in self.callbacks:
+                callback()
+            self.controller.flush()
+            now = monotonic()
+
+            self.frame_time = now - start
+            self.frames += 1
+
+            # if a frame overran, restart the schedule from now
+            # rather than bursting to catch up
+            deadline += interval
+            if deadline < now:
+                self.late_frames += 1
+                deadline = now
+
+            self._stop.wait(deadline - now)
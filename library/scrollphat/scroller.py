@@ -0,0 +1,103 @@
+"""Scroll text at a steady speed, whatever the bus and CPU are doing
+
+The scroll position is worked out from a monotonic clock rather than
+counted one column per step, so a slow frame never slows the text
+down or leaves it behind: the next frame simply jumps to where the
+text should be by then, dropping the columns in between.
+"""
+
+import threading
+
+from .pump import monotonic
+
+
+class Scroller:
+    """Scrolls a controller's buffer at a fixed number of columns per second
+
+    After a run, frames counts the columns drawn, dropped those skipped
+    to catch up, and late_frames those drawn more than half a column
+    after they were due. jitter and max_jitter are the mean and worst
+    lateness, in seconds, of the frames drawn.
+
+    :param controller: IS31FL3730 controller to scroll
+    :param columns_per_second: Scrolling speed (default 10)
+    """
+
+    def __init__(self, controller, columns_per_second=10.0):
+        self.controller = controller
+        self.columns_per_second = float(columns_per_second)
+        self._stop = threading.Event()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.dropped = 0
+        self.late_frames = 0
+        self.max_jitter = 0.0
+        self._total_jitter = 0.0
+
+    @property
+    def jitter(self):
+        if self.frames == 0:
+            return 0.0
+        return self._total_jitter / self.frames
+
+    def stats(self):
+        """Return the frame statistics of the runs so far as a dict"""
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'late_frames': self.late_frames,
+            'jitter': self.jitter,
+            'max_jitter': self.max_jitter,
+        }
+
+    def scroll_text(self, text, loop=False):
+        """Scroll text in from the right, once or until stop() is called
+
+        :param text: Text string to scroll
+        :param loop: Keep scrolling round the buffer (default False)
+        """
+        controller = self.controller
+        controller.clear_buffer()
+        controller.write_string(text, controller.width)
+        self.run(None if loop else controller.buffer_len() - controller.width)
+
+    def run(self, columns=None):
+        """Scroll the buffer from offset 0, through `columns` columns or until stop() is called"""
+        controller = self.controller
+        interval = 1.0 / self.columns_per_second
+        self._stop.clear()
+
+        start = monotonic()
+        shown = 0
+        controller.scroll_to(0)
+
+        while not self._stop.is_set():
+            now = monotonic()
+            position = int((now - start) * self.columns_per_second)
+            if columns is not None and position > columns:
+                position = columns
+
+            if position > shown:
+                # draw where the text should be now, skipping any columns we're late for
+                self.dropped += position - shown - 1
+                controller.scroll_to(position)
+                shown = position
+
+                lateness = monotonic() - (start + position * interval)
+                self.frames += 1
+                self._total_jitter += lateness
+                if lateness > self.max_jitter:
+                    self.max_jitter = lateness
+                if lateness > interval / 2:
+                    self.late_frames += 1
+
+            if shown == columns:
+                break
+
+            self._stop.wait(start + (shown + 1) * interval - monotonic())
+
+    def stop(self):
+        """End a run, from another thread"""
+        self._stop.set()
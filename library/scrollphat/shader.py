@@ -0,0 +1,60 @@
+"""Evaluate pixel shader functions straight into column bytes
+
+If NumPy is installed the handler is first called once with whole
+arrays of x and y coordinates; handlers written with plain arithmetic
+and comparisons, eg: lambda x, y: (x + y) % 2, work unchanged and cost
+a single call per frame. Handlers that can't work on arrays (using
+`if`, `and`, random.random() and so on) fall back to one call per
+pixel, packed directly into columns.
+"""
+
+_numpy = None
+_grids = {}
+
+def _get_numpy():
+    global _numpy
+
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+
+    return _numpy
+
+def _render_vectorized(numpy, handler, width, height):
+    grid = _grids.get((width, height))
+    if grid is None:
+        ys, xs = numpy.mgrid[0:height, 0:width]
+        weights = (1 << numpy.arange(height))[:, None]
+        grid = _grids[(width, height)] = (xs, ys, weights)
+
+    xs, ys, weights = grid
+    try:
+        result = numpy.asarray(handler(xs, ys))
+    except Exception:
+        return None
+
+    if result.shape != (height, width):
+        return None
+
+    return bytearray((result.astype(bool) * weights).sum(axis=0).astype(numpy.uint8).tobytes())
+
+def render_pixels(handler, width=11, height=5):
+    """Return a bytearray of columns with pixels lit where handler(x, y) is true"""
+    numpy = _get_numpy()
+    if numpy:
+        columns = _render_vectorized(numpy, handler, width, height)
+        if columns is not None:
+            return columns
+
+    columns = bytearray(width)
+    for x in range(width):
+        column = 0
+        for y in range(height):
+            if handler(x, y):
+                column |= 1 << y
+        columns[x] = column
+
+    return columns
@@ -0,0 +1,96 @@
+"""Sprites: pre-packed column bytes, drawn with a few bulk operations
+
+Each frame of a sprite is packed into column bytes, the same format as
+the controller's buffer, when the sprite is made, along with its
+horizontal mirror image. Drawing clips the frame to the buffer and
+combines it with what's there as a single slice; the OR, AND-NOT and
+XOR modes treat both slices as one big integer, so even those cost a
+handful of operations whatever the sprite's width.
+"""
+
+from binascii import hexlify, unhexlify
+
+MODES = ('copy', 'or', 'and_not', 'xor')
+
+def _to_int(columns):
+    return int(hexlify(columns), 16)
+
+def _to_bytes(value, length):
+    return unhexlify('{:0{}x}'.format(value, length * 2))
+
+
+class Sprite:
+    """One or more frames of column bytes
+
+    Bit 0 of each column is the top row, as for set_col(). Frames of
+    different widths are padded on the right to the widest.
+
+    :param frames: List of frames, each a list of column bytes
+    """
+
+    def __init__(self, frames):
+        self.width = max(len(frame) for frame in frames)
+        self.frames = [bytes(bytearray(frame) + bytearray(self.width - len(frame))) for frame in frames]
+        self.mirrored = [frame[::-1] for frame in self.frames]
+
+    @classmethod
+    def from_art(cls, *frames):
+        """Make a sprite from frames drawn as lists of strings, one per row
+
+        Spaces and '.' are off, any other character is on, eg:
+        Sprite.from_art(['.#.', '###', '.#.'])
+        """
+        packed = []
+        for rows in frames:
+            columns = [0] * max(len(row) for row in rows)
+            for y, row in enumerate(rows):
+                for x, pixel in enumerate(row):
+                    if pixel not in ' .':
+                        columns[x] |= 1 << y
+            packed.append(columns)
+        return cls(packed)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def draw(self, controller, x=0, frame=0, mode='copy', mirror=False):
+        """Draw a frame into the controller's buffer, clipped to fit
+
+        Call update() to show it.
+
+        :param controller: IS31FL3730 controller to draw on
+        :param x: Buffer column of the sprite's left edge, may be negative
+        :param frame: Index of the frame to draw (default 0)
+        :param mode: 'copy' to replace the columns underneath, 'or' to light the sprite's
+                     pixels, 'and_not' to clear them, or 'xor' to toggle them (default 'copy')
+        :param mirror: Draw the frame flipped left to right (default False)
+        """
+        if mode not in MODES:
+            raise ValueError("mode must be one of {}".format(', '.join(MODES)))
+
+        columns = (self.mirrored if mirror else self.frames)[frame]
+
+        with controller.lock:
+            buffer = controller.buffer
+            if len(buffer) < controller.width:
+                buffer.extend(bytearray(controller.width - len(buffer)))
+
+            start = max(x, 0)
+            end = min(x + self.width, len(buffer))
+            if start >= end:
+                return
+
+            columns = columns[start - x:end - x]
+            if mode == 'copy':
+                buffer[start:end] = columns
+                return
+
+            under = _to_int(bytes(buffer[start:end]))
+            sprite = _to_int(columns)
+            if mode == 'or':
+                under |= sprite
+            elif mode == 'and_not':
+                under &= ~sprite
+            else:
+                under ^= sprite
+            buffer[start:end] = _to_bytes(under, end - start)
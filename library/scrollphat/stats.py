@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from collections import Counter
+
+from .pump import monotonic
+
+# upper bounds, in microseconds, of the write latency histogram buckets
+LATENCY_BUCKETS = [100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000]
+
+# update status of a frame that was not sent because the bus is in holdoff
+HELD_OFF = 'held off'
+
+
+class FrameStats:
+    """Counts frames, bus traffic and timing for one controller
+
+    :param callback: Called with as_dict() at most once per interval
+    :param interval: Seconds between callback reports (default 10)
+    """
+
+    def __init__(self, callback=None, interval=10.0):
+        self.callback = callback
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        self.started = monotonic()
+        self._reported = self.started
+        self.updates = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.frames_held_off = 0
+        self.frames_failed = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.retries = 0
+        self.errors = Counter()
+        self.update_time = 0.0
+        self.update_time_max = 0.0
+        self.write_time = 0.0
+        self.write_time_max = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record_write(self, seconds, length):
+        self.writes += 1
+        self.bytes_written += length
+        self.write_time += seconds
+        if seconds > self.write_time_max:
+            self.write_time_max = seconds
+        self.latency_histogram[bisect_right(LATENCY_BUCKETS, seconds * 1000000)] += 1
+
+    def record_error(self, error):
+        self.errors[type(error).__name__] += 1
+
+    def record_retry(self):
+        self.retries += 1
+
+    # sent is True for a written frame, False for a failed write,
+    # None for an unchanged frame that was skipped and HELD_OFF
+    # for a frame left pending while the bus recovers
+    def record_update(self, seconds, sent):
+        self.updates += 1
+        if sent == HELD_OFF:
+            self.frames_held_off += 1
+        elif sent:
+            self.frames_sent += 1
+        elif sent is None:
+            self.frames_skipped += 1
+        else:
+            self.frames_failed += 1
+        self.update_time += seconds
+        if seconds > self.update_time_max:
+            self.update_time_max = seconds
+
+        if self.callback is not None:
+            now = monotonic()
+            if now - self._reported >= self.interval:
+                self._reported = now
+                self.callback(self.as_dict())
+
+    def as_dict(self):
+        elapsed = monotonic() - self.started
+        histogram = {}
+        low = 0
+        for high, count in zip(LATENCY_BUCKETS + [None], self.latency_histogram):
+            histogram['{}us+'.format(low) if high is None else '<{}us'.format(high)] = count
+            low = high
+
+        return {
+            'elapsed': elapsed,
+            'fps': self.frames_sent / elapsed if elapsed else 0.0,
+            'updates': self.updates,
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped,
+            'frames_held_off': self.frames_held_off,
+            'frames_failed': self.frames_failed,
+            'writes': self.writes,
+            'bytes_written': self.bytes_written,
+            'retries': self.retries,
+            'errors': dict(self.errors),
+            'update_time_mean': self.update_time / self.updates if self.updates else 0.0,
+            'update_time_max': self.update_time_max,
+            'write_latency_mean': self.write_time / self.writes if self.writes else 0.0,
+            'write_latency_max': self.write_time_max,
+            'write_latency_histogram': histogram,
+        }
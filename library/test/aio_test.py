@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.aio import AsyncScrollPhat
+from is31fl3730_test import FakeI2c
+
+
+# Blocks every column write until released, so tests can
+# pile up update requests while a frame is on the bus
+class SlowI2c(FakeI2c):
+    def __init__(self):
+        FakeI2c.__init__(self)
+        self.gate = threading.Event()
+
+    def write_i2c_block_data(self, addr, mode, size):
+        if mode == 0x01:
+            self.gate.wait()
+        FakeI2c.write_i2c_block_data(self, addr, mode, size)
+
+
+class AsyncScrollPhatTest(unittest.TestCase):
+
+    def test_update_writes_buffer(self):
+        fakeI2c = FakeI2c()
+        sut = AsyncScrollPhat(IS31FL3730(fakeI2c, {}))
+
+        async def main():
+            sut.controller.set_col(2, 31)
+            await sut.update()
+
+        asyncio.run(main())
+        sut.close()
+        self.assertEqual(fakeI2c.write_i2c_block_data_calls[-1]["size"][2], 31)
+
+    def test_overlapping_updates_are_coalesced(self):
+        slowI2c = SlowI2c()
+        controller = IS31FL3730(slowI2c, {})
+        sut = AsyncScrollPhat(controller)
+
+        async def main():
+            first = asyncio.ensure_future(sut.update())
+            await asyncio.sleep(0.01)
+            later = []
+            for x in range(5):
+                controller.set_col(x, 31)
+                later.append(asyncio.ensure_future(sut.update()))
+            await asyncio.sleep(0.01)
+            slowI2c.gate.set()
+            await asyncio.gather(first, *later)
+
+        asyncio.run(main())
+        sut.close()
+        self.assertEqual(controller.frames_sent(), 2)
+        self.assertEqual(list(controller.window[:5]), [31] * 5)
+        self.assertEqual(slowI2c.write_i2c_block_data_calls[-2]["size"], [31] * 5)
+
+    def test_graph_passes_reduce_and_columns(self):
+        values = [0, 5, 1, 4, 2, 3, 0, 5, 1, 4, 2, 3]
+        expected = IS31FL3730(FakeI2c(), {})
+        expected.graph(values, 0, 5, 'max', 6)
+        sut = AsyncScrollPhat(IS31FL3730(FakeI2c(), {}))
+
+        async def main():
+            await sut.graph(values, 0, 5, reduce='max', columns=6)
+
+        asyncio.run(main())
+        sut.close()
+        self.assertEqual(sut.controller.buffer, expected.buffer)
+        self.assertNotEqual(list(sut.controller.buffer[:6]), [0] * 6)
+
+    def test_animate_stops_when_frame_returns_false(self):
+        sut = AsyncScrollPhat(IS31FL3730(FakeI2c(), {}))
+        frames = []
+
+        def frame(n):
+            frames.append(n)
+            sut.controller.set_col(0, n)
+            return n < 3
+
+        asyncio.run(sut.animate(frame, fps=1000))
+        self.assertEqual(frames, [0, 1, 2, 3])
+        self.assertEqual(sut.controller.frames_sent(), 3)
+        sut.close()
+
+    def test_animate_can_be_cancelled(self):
+        sut = AsyncScrollPhat(IS31FL3730(FakeI2c(), {}))
+
+        async def main():
+            task = asyncio.ensure_future(sut.animate(lambda n: None, fps=1000))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        sut.close()
+
+if __name__ == '__main__':
+    unittest.main()
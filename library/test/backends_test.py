@@ -0,0 +1,77 @@
+import io
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.backends import SimulatorBackend, RecorderBackend, read_recording, replay
+
+
+class SimulatorBackendTest(unittest.TestCase):
+
+    def test_frames_are_latched_by_update_register(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator)
+        sut.set_col(0, 31)
+        sut.update()
+        sut.set_col(10, 1)
+        sut.update()
+        self.assertEqual(len(simulator.frames), 2)
+        self.assertEqual(simulator.frame(), b'\x1f' + b'\x00' * 9 + b'\x01')
+        self.assertEqual(simulator.registers[0x60][0x00], 0b00000011)
+
+    def test_history_is_bounded(self):
+        simulator = SimulatorBackend(history=2)
+        simulator.write_i2c_block_data(0x60, 0x00, [0b00000011])
+        for x in range(5):
+            simulator.write_i2c_block_data(0x60, 0x01, [x] * 11 + [0xff])
+        self.assertEqual([frame[0] for frame in simulator.frames], [3, 4])
+
+    def test_render(self):
+        simulator = SimulatorBackend()
+        simulator.write_i2c_block_data(0x60, 0x00, [0b00000011])
+        simulator.write_i2c_block_data(0x60, 0x01, [1, 16] + [0] * 9 + [0xff])
+        self.assertEqual(simulator.render().split('\n')[0], '#..........')
+        self.assertEqual(simulator.render().split('\n')[4], '.#.........')
+        self.assertEqual(len(simulator.render().split('\n')), 5)
+
+    def test_frame_follows_mode_register(self):
+        simulator = SimulatorBackend()
+        simulator.write_i2c_block_data(0x60, 0x00, [0b00011000])
+        simulator.write_i2c_block_data(0x60, 0x0E, [2] * 8)
+        simulator.write_i2c_block_data(0x60, 0x01, [1] * 11 + [0xff])
+        self.assertEqual(simulator.frame(), b'\x01' * 8 + b'\x02' * 8)
+        self.assertEqual(simulator.rows(), 8)
+
+
+class RecorderBackendTest(unittest.TestCase):
+
+    def test_record_and_replay(self):
+        stream = io.BytesIO()
+        recorder = RecorderBackend(stream)
+        sut = IS31FL3730(None, {}, bus=recorder)
+        sut.set_brightness(10)
+        sut.set_col(3, 7)
+        sut.update()
+
+        stream.seek(0)
+        records = list(read_recording(stream))
+        self.assertEqual([r[2] for r in records], [0x00, 0x19, 0x01])
+        self.assertEqual(records[2][3][3], 7)
+
+        stream.seek(0)
+        simulator = SimulatorBackend()
+        replay(stream, simulator)
+        self.assertEqual(simulator.brightness(), 10)
+        self.assertEqual(simulator.frame()[3], 7)
+
+    def test_forwards_to_backend(self):
+        simulator = SimulatorBackend()
+        recorder = RecorderBackend(io.BytesIO(), simulator)
+        recorder.write_i2c_block_data(0x60, 0x19, [5])
+        self.assertEqual(simulator.brightness(), 5)
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            list(read_recording(io.BytesIO(b'nope')))
+
+if __name__ == '__main__':
+    unittest.main()
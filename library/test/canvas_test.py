@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.backends import SimulatorBackend
+from scrollphat.canvas import Canvas
+
+
+# Records which thread each write arrives on
+class ThreadedSimulator(SimulatorBackend):
+    def __init__(self):
+        SimulatorBackend.__init__(self)
+        self.threads = set()
+
+    def write_i2c_block_data(self, addr, register, data):
+        self.threads.add(threading.current_thread().name)
+        SimulatorBackend.write_i2c_block_data(self, addr, register, data)
+
+
+class CanvasTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bus1 = ThreadedSimulator()
+        self.bus2 = ThreadedSimulator()
+        self.sut = Canvas([(self.bus1, 0x60), (self.bus1, 0x61), (self.bus2, 0x60)])
+
+    def tearDown(self):
+        self.sut.close()
+
+    def frame(self, bus, addr):
+        return bytes(bus.registers[addr][0x01:0x0C])
+
+    def test_canvas_is_as_wide_as_its_displays(self):
+        self.assertEqual(self.sut.width, 33)
+        self.assertEqual(self.sut.buffer_len(), 33)
+
+    def test_buffer_is_split_across_displays(self):
+        self.sut.set_buffer(range(1, 34))
+        self.sut.update()
+        self.assertEqual(self.frame(self.bus1, 0x60), bytes(range(1, 12)))
+        self.assertEqual(self.frame(self.bus1, 0x61), bytes(range(12, 23)))
+        self.assertEqual(self.frame(self.bus2, 0x60), bytes(range(23, 34)))
+
+    def test_scroll_crosses_display_boundaries(self):
+        self.sut.set_buffer(range(1, 41))
+        self.sut.scroll(5)
+        self.assertEqual(self.frame(self.bus1, 0x61)[:2], bytes([17, 18]))
+        self.assertEqual(self.frame(self.bus2, 0x60)[-4:], bytes([35, 36, 37, 38]))
+
+    def test_separate_buses_are_written_by_workers(self):
+        self.sut.set_col(0, 1)
+        self.sut.update()
+        for name in self.bus1.threads | self.bus2.threads:
+            self.assertTrue(name.startswith("scrollphat-canvas"))
+
+    def test_single_bus_is_written_inline(self):
+        bus = ThreadedSimulator()
+        sut = Canvas([(bus, 0x60), (bus, 0x61)])
+        sut.update()
+        self.assertEqual(bus.threads, set([threading.current_thread().name]))
+
+    def test_brightness_applies_to_every_display(self):
+        self.sut.set_brightness(40)
+        self.assertEqual(self.bus1.brightness(0x61), 40)
+        self.assertEqual(self.bus2.brightness(0x60), 40)
+
+    def test_accepts_controllers(self):
+        display = IS31FL3730(None, {}, bus=SimulatorBackend())
+        sut = Canvas([display])
+        sut.set_col(2, 7)
+        sut.update()
+        self.assertEqual(display.bus.frame()[2], 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.backends import SimulatorBackend
+from is31fl3730_test import FakeI2c
+
+
+class DoubleBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = SimulatorBackend()
+        self.sut = IS31FL3730(None, {ord('a'): [31, 31]}, bus=self.simulator)
+
+    def test_drawing_is_off_screen_until_swap(self):
+        self.sut.set_col(0, 1)
+        self.sut.update()
+        self.sut.enable_double_buffer()
+
+        self.sut.clear_buffer()
+        self.sut.write_string('a', 3)
+        self.assertEqual(list(self.simulator.frame()[:5]), [1, 0, 0, 0, 0])
+
+        self.sut.swap()
+        self.assertEqual(list(self.simulator.frame()[:5]), [0, 0, 0, 31, 31])
+
+    def test_swap_exchanges_without_copying(self):
+        self.sut.enable_double_buffer()
+        back = self.sut.buffer
+        front = self.sut._front[0]
+        self.sut.swap()
+        self.assertTrue(self.sut._front[0] is back)
+        self.assertTrue(self.sut.buffer is front)
+
+    def test_offset_is_published_with_the_frame(self):
+        self.sut.enable_double_buffer()
+        self.sut.set_buffer(range(1, 16))
+        self.sut.scroll(4)
+        self.assertEqual(list(self.simulator.frame()), [0] * 11)
+        self.sut.swap()
+        self.assertEqual(self.simulator.frame()[0], 5)
+
+    def test_disable_keeps_last_frame(self):
+        self.sut.enable_double_buffer()
+        self.sut.set_col(2, 7)
+        self.sut.swap()
+        self.sut.set_col(2, 9)
+        self.sut.disable_double_buffer()
+        self.assertEqual(self.sut.buffer[2], 7)
+        self.sut.set_col(3, 1)
+        self.sut.update()
+        self.assertEqual(list(self.simulator.frame()[2:4]), [7, 1])
+
+    def test_swap_requires_double_buffering(self):
+        with self.assertRaises(RuntimeError):
+            IS31FL3730(FakeI2c(), {}).swap()
+
+    def test_flushing_thread_never_sees_partial_frames(self):
+        self.sut.enable_double_buffer()
+        seen = set()
+        done = threading.Event()
+
+        def flush():
+            while not done.is_set():
+                self.sut.flush()
+                seen.add(tuple(self.simulator.frame()))
+
+        flusher = threading.Thread(target=flush)
+        flusher.start()
+        try:
+            for i in range(200):
+                value = i % 31 + 1
+                self.sut.clear_buffer()
+                for x in range(11):
+                    self.sut.set_col(x, value)
+                self.sut.swap()
+        finally:
+            done.set()
+            flusher.join()
+
+        for frame in seen:
+            self.assertTrue(len(set(frame)) <= 1, frame)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import time
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.fade import Fader, GAMMA_TABLE, perceived
+from scrollphat.pump import FramePump
+from is31fl3730_test import FakeI2c
+
+
+class FaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = FakeI2c()
+        self.controller = IS31FL3730(self.bus, {})
+        self.controller.set_brightness(0)
+
+    def brightness_writes(self):
+        return [c["size"][0] for c in self.bus.write_i2c_block_data_calls if c["mode"] == 0x19]
+
+    def test_gamma_table(self):
+        self.assertEqual(GAMMA_TABLE[0], 0)
+        self.assertEqual(GAMMA_TABLE[255], 255)
+        self.assertTrue(GAMMA_TABLE[128] < 64)
+        self.assertEqual(perceived(GAMMA_TABLE[200]), 200)
+
+    def test_controller_skips_unchanged_brightness(self):
+        self.controller.set_brightness(0)
+        self.controller.set_brightness(0)
+        self.assertEqual(self.brightness_writes(), [0])
+
+    def test_fade_steps(self):
+        sut = Fader(self.controller)
+        sut._pump = object()  # take steps by hand
+        sut.fade_to(255, 1.0)
+        began = time.monotonic()
+        self.assertTrue(sut.step(began + 0.5))
+        self.assertEqual(self.controller.get_brightness(), GAMMA_TABLE[128])
+        self.assertFalse(sut.step(began + 2))
+        self.assertEqual(self.controller.get_brightness(), 255)
+        self.assertFalse(sut.busy())
+
+    def test_slow_fade_writes_each_register_value_once(self):
+        sut = Fader(self.controller)
+        sut._pump = object()
+        sut.fade_to(40, 1.0)
+        began = time.monotonic()
+        for i in range(1001):
+            sut.step(began + i / 1000.0)
+        writes = self.brightness_writes()
+        self.assertEqual(writes, sorted(set(writes)))
+        self.assertEqual(writes[-1], GAMMA_TABLE[40])
+
+    def test_timer_runs_fade(self):
+        sut = Fader(self.controller, rate=200)
+        sut.fade_to(255, 0.05)
+        time.sleep(0.2)
+        self.assertFalse(sut.busy())
+        self.assertEqual(self.controller.get_brightness(), 255)
+
+    def test_fade_started_as_timer_exits(self):
+        sut = Fader(self.controller, rate=200)
+        step = sut.step
+        started = []
+
+        # start the next fade from the timer thread, just as the first
+        # finishes and before the thread gets to exit
+        def last_step(now=None):
+            more = step(now)
+            if not more and not started:
+                started.append(True)
+                sut.fade_to(0, 0.02)
+            return more
+        sut.step = last_step
+
+        sut.fade_to(255, 0.02)
+        time.sleep(0.2)
+        self.assertEqual(started, [True])
+        self.assertFalse(sut.busy())
+        self.assertEqual(self.controller.get_brightness(), 0)
+
+    def test_pump_runs_pulse(self):
+        pump = FramePump(self.controller, fps=200)
+        sut = Fader(self.controller)
+        sut.attach(pump)
+        sut.pulse(0.04, 0, 255)
+        pump.start()
+        time.sleep(0.1)
+        sut.stop()
+        pump.stop()
+        self.assertTrue(len(set(self.brightness_writes())) > 3)
+
+if __name__ == '__main__':
+    unittest.main()
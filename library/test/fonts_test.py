@@ -0,0 +1,222 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.font import font
+from scrollphat import fonts
+from scrollphat.fonts import BinaryFont, FontChain, from_image, save_font
+from is31fl3730_test import FakeI2c
+
+
+class BinaryFontTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'font.bin')
+        save_font(font, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        sut = BinaryFont.open(self.path)
+        self.assertEqual(sut.height, 5)
+        self.assertEqual(len(sut), len(font))
+        self.assertEqual(dict(sut), font)
+
+    def test_glyphs_are_loaded_lazily(self):
+        sut = BinaryFont.open(self.path)
+        self.assertEqual(sut._glyphs, {})
+        self.assertEqual(sut[ord('A')], font[ord('A')])
+        self.assertEqual(list(sut._glyphs), [ord('A')])
+
+    def test_missing_glyphs(self):
+        sut = BinaryFont.open(self.path)
+        self.assertFalse(0x263a in sut)
+        self.assertTrue(sut.get(0x263a) is None)
+        with self.assertRaises(KeyError):
+            sut[0x263a]
+
+    def test_renders_like_dictionary(self):
+        sut = IS31FL3730(FakeI2c(), BinaryFont.open(self.path))
+        expected = IS31FL3730(FakeI2c(), font)
+        self.assertEqual(sut.render_string('Hello, world!'), expected.render_string('Hello, world!'))
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            BinaryFont(b'PNG\x00\x00\x00\x00\x00')
+
+    def test_rejects_truncated_files(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for length in (3, 15, len(data) - 1):
+            with self.assertRaises(ValueError):
+                BinaryFont(data[:length])
+
+
+class FontChainTest(unittest.TestCase):
+
+    icons = {0x2665: [0x06, 0x0f, 0x1e, 0x0f, 0x06], ord('A'): [0x1f]}
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, 'latin.bin')
+        save_font({0xe9: [0x0e, 0x15, 0x17], 0xdf: [0x1f, 0x15, 0x0a]}, path)
+        self.latin = BinaryFont.open(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_first_font_wins(self):
+        sut = FontChain(self.icons, self.latin, font)
+        self.assertEqual(sut[0x2665], self.icons[0x2665])
+        self.assertEqual(sut[ord('A')], [0x1f])
+        self.assertEqual(sut[0xe9], [0x0e, 0x15, 0x17])
+        self.assertEqual(sut[ord('z')], font[ord('z')])
+        self.assertEqual(len(sut), len(font) + 3)
+
+    def test_index_does_not_load_glyphs(self):
+        sut = FontChain(self.latin, font)
+        self.assertEqual(self.latin._glyphs, {})
+        sut[0xdf]
+        self.assertEqual(list(self.latin._glyphs), [0xdf])
+
+    def test_resolutions_are_cached(self):
+        sut = FontChain(self.icons, font)
+        self.assertEqual(sut.get(0xe8), font[ord('e')])
+        self.assertTrue(sut.get(0x263a) is None)
+        self.assertEqual(sut._resolved, {0xe8: font[ord('e')], ord('e'): font[ord('e')], 0x263a: None})
+
+    def test_accents_fall_back_to_base(self):
+        sut = FontChain(self.latin, font)
+        self.assertEqual(sut[0xe9], [0x0e, 0x15, 0x17])
+        self.assertEqual(sut[0xea], font[ord('e')])
+        self.assertFalse(0xea in FontChain(self.latin, font, decompose=False))
+
+    def test_load_font_list(self):
+        controller = IS31FL3730(FakeI2c(), None)
+        controller.load_font([self.icons, font])
+        self.assertTrue(isinstance(controller.font, FontChain))
+        self.assertEqual(controller.render_string(u'\u2665e'),
+                         bytes(bytearray(self.icons[0x2665] + [0] + font[ord('e')] + [0])))
+        self.assertEqual(controller.render_string(u'\xe9'), controller.render_string(u'e'))
+
+
+class FakeImage:
+    """Draws glyphs into a grid of cells, the way a font image is laid out"""
+
+    def __init__(self, glyphs, columns, rows, border=0, ink=1, paper=0, order='rows'):
+        self.mode = 'L'
+        self.size = (columns * 6, rows * 6)
+        self.pixels = [paper] * (self.size[0] * self.size[1])
+        self.reads = 0
+        for i, columns_bits in enumerate(glyphs):
+            cx, cy = (i % columns, i // columns) if order == 'rows' else (i // rows, i % rows)
+            for x, bits in enumerate(columns_bits):
+                for y in range(5):
+                    if bits & (1 << y):
+                        self.pixels[(cy * 6 + border + y) * self.size[0] + cx * 6 + border + x] = ink
+
+    def getdata(self):
+        self.reads += 1
+        return self.pixels
+
+    def tobytes(self):
+        return bytes(bytearray(self.pixels))
+
+
+class FromImageTest(unittest.TestCase):
+
+    glyphs = [font[c] for c in range(0x20, 0x20 + 12)]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def expected(self):
+        return dict((0x20 + i, glyph) for i, glyph in enumerate(self.glyphs))
+
+    def test_rows_with_border(self):
+        image = FakeImage(self.glyphs, 4, 3, border=1)
+        self.assertEqual(from_image(image, columns=4, rows=3, border=1, cache=False), self.expected())
+        self.assertEqual(image.reads, 1)
+
+    def test_columns_with_black_ink(self):
+        image = FakeImage(self.glyphs, 3, 4, ink=0, paper=255, order='columns')
+        sut = from_image(image, columns=3, rows=4, ink=0, order='columns', cache=False)
+        self.assertEqual(sut, self.expected())
+
+    def test_rgb_pixels(self):
+        image = FakeImage(self.glyphs, 4, 3, ink=(0, 0, 0), paper=(255, 255, 255))
+        image.mode = 'RGB'
+        self.assertEqual(from_image(image, columns=4, rows=3, ink=(0, 0, 0), cache=False), self.expected())
+
+        blank = FakeImage([], 4, 3, paper=(255, 255, 255))
+        sut = from_image(blank, columns=4, rows=3, ink=0, cache=False)
+        self.assertEqual(set(map(tuple, sut.values())), set([()]))
+
+    def test_ink_function(self):
+        image = FakeImage(self.glyphs, 4, 3, ink=200, paper=10)
+        sut = from_image(image, columns=4, rows=3, ink=lambda pixel: pixel > 128, cache=self.dir)
+        self.assertEqual(sut, self.expected())
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_cached_conversion(self):
+        image = FakeImage(self.glyphs, 4, 3)
+        self.assertEqual(from_image(image, columns=4, rows=3, cache=self.dir), self.expected())
+        cached = from_image(image, columns=4, rows=3, cache=self.dir)
+        self.assertTrue(isinstance(cached, BinaryFont))
+        self.assertEqual(dict(cached), self.expected())
+        self.assertEqual(image.reads, 1)
+
+        # a different layout is a different font
+        from_image(image, columns=4, rows=3, border=1, cache=self.dir)
+        self.assertEqual(image.reads, 2)
+        self.assertEqual(len(os.listdir(self.dir)), 2)
+
+    def test_damaged_cache_is_replaced(self):
+        image = FakeImage(self.glyphs, 4, 3)
+        from_image(image, columns=4, rows=3, cache=self.dir)
+        path = os.path.join(self.dir, os.listdir(self.dir)[0])
+        with open(path, 'r+b') as f:
+            f.truncate(15)
+
+        self.assertEqual(from_image(image, columns=4, rows=3, cache=self.dir), self.expected())
+        self.assertEqual(image.reads, 2)
+        self.assertEqual(dict(BinaryFont.open(path)), self.expected())
+
+    def test_cached_file_skips_pil(self):
+        opened = []
+        image = FakeImage(self.glyphs, 4, 3)
+
+        class FakePIL:
+            @staticmethod
+            def open(path):
+                opened.append(path)
+                return image
+
+        path = os.path.join(self.dir, 'font.png')
+        with open(path, 'wb') as f:
+            f.write(b'not really a png')
+
+        saved = fonts._image
+        fonts._image = FakePIL
+        try:
+            cache = os.path.join(self.dir, 'cache')
+            self.assertEqual(from_image(path, columns=4, rows=3, cache=cache), self.expected())
+            self.assertEqual(dict(from_image(path, columns=4, rows=3, cache=cache)), self.expected())
+            self.assertEqual(opened, [path])
+
+            with open(path, 'ab') as f:
+                f.write(b'!')
+            from_image(path, columns=4, rows=3, cache=cache)
+            self.assertEqual(opened, [path, path])
+        finally:
+            fonts._image = saved
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import random
+import unittest
+
+from scrollphat import shader
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.graph import StreamingGraph, downsample
+from is31fl3730_test import FakeI2c
+
+
+class CountingBuffer(bytearray):
+
+    def __init__(self, *args):
+        bytearray.__init__(self, *args)
+        self.columns = []
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            self.columns.append(key)
+        bytearray.__setitem__(self, key, value)
+
+
+class StreamingGraphTest(unittest.TestCase):
+
+    def expected(self, values, low=None, high=None):
+        reference = IS31FL3730(FakeI2c(), {})
+        reference.graph(values, low, high)
+        return list(reference.buffer[:len(values)])
+
+    def test_flat_series(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.graph([3, 3, 3])
+        self.assertEqual(list(sut.buffer[:3]), [0, 0, 0])
+        sut.graph([3, 4], 3, 3)
+        self.assertEqual(list(sut.buffer[:2]), [0, 0x1f])
+
+    def test_matches_graph(self):
+        random.seed(21)
+        controller = IS31FL3730(FakeI2c(), {})
+        sut = StreamingGraph(controller)
+        samples = []
+        for i in range(40):
+            sample = random.choice([random.randint(0, 100), 50])
+            samples.append(sample)
+            sut.push(sample)
+            shown = samples[-11:]
+            self.assertEqual(sut.values, shown)
+            self.assertEqual(sut.low, min(shown))
+            self.assertEqual(sut.high, max(shown))
+            expected = [0] * (11 - len(shown)) + self.expected(shown)
+            self.assertEqual(list(controller.buffer[:11]), expected)
+
+    def test_fixed_scale(self):
+        controller = IS31FL3730(FakeI2c(), {})
+        sut = StreamingGraph(controller, size=4, low=0, high=25, x=2)
+        sut.extend([0, 10, 25, 50, 5])
+        self.assertEqual(sut.values, [10, 25, 50, 5])
+        self.assertEqual(list(controller.buffer[2:6]), self.expected([10, 25, 50, 5], 0, 25))
+        self.assertEqual(list(controller.buffer[:2]), [0, 0])
+
+    def test_only_changed_columns_are_written(self):
+        controller = IS31FL3730(FakeI2c(), {})
+        controller.buffer = CountingBuffer(11)
+        sut = StreamingGraph(controller, low=0, high=10)
+        sut.extend(range(11))
+
+        del controller.buffer.columns[:]
+        sut.push(5)
+        self.assertEqual(controller.buffer.columns, [10])
+
+        # a new maximum rescales every bar, but only those that move are written
+        sut = StreamingGraph(controller)
+        sut.extend([0, 10] * 5 + [5])
+        del controller.buffer.columns[:]
+        sut.push(20)
+        self.assertEqual(controller.buffer.columns, [0, 2, 4, 6, 8, 9, 10])
+
+    def test_clear(self):
+        controller = IS31FL3730(FakeI2c(), {})
+        sut = StreamingGraph(controller, size=3)
+        sut.extend([1, 2, 3])
+        sut.clear()
+        self.assertEqual(sut.values, [])
+        self.assertEqual(list(controller.buffer[:3]), [0, 0, 0])
+        sut.push(7)
+        self.assertEqual(sut.values, [7.0])
+
+
+class DownsampleTest(unittest.TestCase):
+
+    series = [float(x % 7) for x in range(25)]
+
+    def check(self):
+        self.assertEqual(downsample(self.series, 4), [2.5, 16 / 6.0, 17 / 6.0, 3.0])
+        self.assertEqual(downsample(self.series, 4, 'max'), [5, 6, 6, 6])
+        self.assertEqual(downsample(self.series, 4, 'last'), [5, 4, 3, 3])
+        self.assertEqual(downsample(iter(self.series), 4, 'envelope'), ([0, 0, 0, 0], [5, 6, 6, 6]))
+        self.assertEqual(downsample([1, 2], 4), [1, 2])
+        self.assertEqual(downsample([1, 2], 4, 'envelope'), ([1, 2], [1, 2]))
+        with self.assertRaises(ValueError):
+            downsample(self.series, 4, 'median')
+
+    def test_pure_python(self):
+        saved = shader._numpy
+        shader._numpy = False
+        try:
+            self.check()
+        finally:
+            shader._numpy = saved
+
+    @unittest.skipUnless(shader._get_numpy(), "NumPy is not installed")
+    def test_vectorized(self):
+        self.check()
+        numpy = shader._get_numpy()
+        self.assertEqual(downsample(numpy.array(self.series), 4, 'max'), [5, 6, 6, 6])
+
+    def test_long_series_fits_display(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.graph(x % 60 for x in range(3600))
+        self.assertEqual(len(sut.buffer), 11)
+        sut.graph(range(3600), reduce='last')
+        self.assertEqual(sut.buffer[10], 0x1f)
+
+    def test_envelope(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.graph([0, 10, 4, 6, 5, 5], 0, 10, reduce='envelope', columns=3)
+        self.assertEqual(list(sut.buffer[:3]), [0x1f, 0x04, 0x04])
+        sut.graph([10, 10], 0, 10, reduce='envelope', columns=1)
+        self.assertEqual(sut.buffer[0], 0x01)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import time
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.backends import SimulatorBackend
+from scrollphat.canvas import Canvas
+from scrollphat.greyscale import GreyscaleDisplay, bus_limit, measure_throughput
+
+
+class GreyscaleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = SimulatorBackend()
+        self.controller = IS31FL3730(None, {}, bus=self.simulator)
+
+    def test_canvas_is_rejected(self):
+        canvas = Canvas([self.controller, IS31FL3730(None, {}, bus=SimulatorBackend())])
+        with self.assertRaises(TypeError):
+            GreyscaleDisplay(canvas)
+        with self.assertRaises(TypeError):
+            bus_limit(canvas)
+        with self.assertRaises(TypeError):
+            measure_throughput(canvas, 0.01)
+        GreyscaleDisplay(canvas.displays[0])
+
+    def test_planes(self):
+        sut = GreyscaleDisplay(self.controller, bits=2)
+        sut.set_pixel(0, 0, 1)
+        sut.set_pixel(0, 1, 2)
+        sut.set_pixel(1, 4, 3)
+        sut.set_pixel(2, 2, 9)
+        planes = sut.planes()
+        self.assertEqual(list(planes[0][:3]), [0b00001, 0b10000, 0b00100])
+        self.assertEqual(list(planes[1][:3]), [0b00010, 0b10000, 0b00100])
+
+    def test_schedule_weights_planes_and_merges_equal_ones(self):
+        sut = GreyscaleDisplay(self.controller, bits=3)
+        sut.set_pixel(0, 0, 1)
+        sut.show()
+        self.assertEqual([units for writes, units in sut._schedule], [1, 6])
+        # one block write per sub-frame
+        self.assertEqual([len(writes) for writes, units in sut._schedule], [1, 1])
+
+    def test_refresh_thread_cycles_planes(self):
+        sut = GreyscaleDisplay(self.controller, bits=2, refresh=200)
+        sut.set_pixel(0, 0, 1)
+        sut.set_pixel(1, 0, 2)
+        sut.show()
+        sut.start()
+        time.sleep(0.05)
+        sut.stop()
+        self.assertTrue(sut.cycles > 1)
+        frames = set(frame[:2] for frame in self.simulator.frames)
+        self.assertTrue(b'\x01\x00' in frames)
+        self.assertTrue(b'\x00\x01' in frames)
+
+    def test_limits(self):
+        self.assertTrue(700 < bus_limit(self.controller) < 800)
+        self.assertTrue(measure_throughput(self.controller, 0.01) > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import scrollphat
+from is31fl3730_test import FakeI2c
+
+
+class InitTest(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        # in a fresh interpreter, since other tests load the font
+        library = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        output = subprocess.check_output([sys.executable, '-c',
+            "import sys, scrollphat; print(sorted(set(['smbus', 'scrollphat.font', 'scrollphat.fonts', 'hashlib', 'mmap', 'unicodedata']) & set(sys.modules)))"],
+            cwd=library)
+        self.assertEqual(output.strip(), b'[]')
+
+    def test_builtin_font_is_public(self):
+        from scrollphat.font import font
+        self.assertTrue(scrollphat.builtin_font() is font)
+        self.assertTrue(scrollphat.font is font)
+        from scrollphat import font as imported
+        self.assertTrue(imported is font)
+
+    def test_compiled_fonts_are_exported(self):
+        from scrollphat import fonts
+        self.assertTrue(scrollphat.BinaryFont is fonts.BinaryFont)
+        self.assertTrue(scrollphat.FontChain is fonts.FontChain)
+
+    def test_load_font_accepts_font_module(self):
+        import scrollphat.font
+        module = sys.modules['scrollphat.font']
+        sut = scrollphat.IS31FL3730(FakeI2c(), {})
+        sut.load_font(module)
+        self.assertTrue(sut.font is module.font)
+        sut.load_font([{}, module])
+        self.assertEqual(sut.font[ord('A')], module.font[ord('A')])
+
+    def test_configure_then_write(self):
+        fakeI2c = FakeI2c()
+        scrollphat.configure(bus=fakeI2c, address=0x62)
+        try:
+            scrollphat.write_string('Hi')
+            self.assertEqual(fakeI2c.write_i2c_block_data_calls[-1]["addr"], 0x62)
+            self.assertEqual(fakeI2c.write_i2c_block_data_calls[-1]["size"][:3], [31, 4, 31])
+            with self.assertRaises(RuntimeError):
+                scrollphat.configure(bus=2)
+        finally:
+            scrollphat.controller = None
+            scrollphat.configure()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 from scrollphat.IS31FL3730 import IS31FL3730, I2cConstants
+from scrollphat.backends import SimulatorBackend
 
 
 # Fakes i2c to allow testing off-device
@@ -10,6 +11,8 @@ class FakeI2c:
     def __init__(self):
         self.write_i2c_block_data_calls = []
         pass
+    def SMBus(self, bus):
+        return self
     def write_i2c_block_data(self,addr,mode,size):
         call = {"addr":addr, "mode":mode, "size": size}
         self.write_i2c_block_data_calls.append(call)
@@ -25,7 +28,7 @@ class DeviceTest(unittest.TestCase):
         sut = IS31FL3730(fakeI2c, font)
         constants = I2cConstants()
         sut.set_brightness(5)
-        self.assertEquals(fakeI2c.write_i2c_block_data_calls[0]["size"], [5])
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[-1]["size"], [5])
         self.assertEquals(sut.get_brightness(), 5)
 
     def test_set_brightness_when_it_was_never_set(self):
@@ -63,5 +66,163 @@ class DeviceTest(unittest.TestCase):
         sut.set_mode(constants.MODE_5X11)
         self.assertEquals(fakeI2c.write_i2c_block_data_calls[0]["size"], [constants.MODE_5X11])
 
+    def test_update_skips_unchanged_frame(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.update()
+        sut.update()
+        self.assertEquals(len(fakeI2c.write_i2c_block_data_calls), 2)
+        self.assertEquals(sut.frames_sent(), 1)
+        self.assertEquals(sut.frames_skipped(), 1)
+
+    def test_update_sends_changed_frame(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator)
+        sut.update()
+        sut.set_col(3, 31)
+        sut.update()
+        self.assertEquals(simulator.frame()[3], 31)
+        self.assertEquals(sut.frames_sent(), 2)
+        self.assertEquals(sut.frames_skipped(), 0)
+
+    def test_update_resends_after_set_mode(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.update()
+        sut.set_mode()
+        sut.update()
+        self.assertEquals(sut.frames_sent(), 2)
+
+    def test_bus_is_opened_on_first_write(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_col(0, 1)
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls, [])
+        sut.update()
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[0]["mode"], 0x00)
+
+    def test_open_bus_object_and_address(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(None, {}, bus=fakeI2c, address=0x61)
+        sut.update()
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[-1]["addr"], 0x61)
+
+    def test_set_col_grows_buffer(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.set_col(20, 7)
+        self.assertEquals(sut.buffer_len(), 21)
+        self.assertEquals(sut.buffer[20], 7)
+        self.assertEquals(sut.buffer[11], 0)
+
+    def test_update_wraps_window(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_buffer(range(1, 16))
+        sut.scroll_to(10)
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[-1]["size"],
+                          [11, 12, 13, 14, 15, 1, 2, 3, 4, 5, 6, 0xff])
+
+    def test_update_pads_short_buffer(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_buffer([1, 2, 3])
+        sut.scroll_to(1)
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[-1]["size"],
+                          [2, 3, 1, 2, 3] + [0] * 6 + [0xff])
+
+    def test_update_with_offset_past_shorter_buffer(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.set_buffer(range(1, 31))
+        sut.scroll_to(25)
+        sut.set_buffer([1, 2, 3])
+        sut.update()
+        self.assertEqual(list(sut.window), [1, 2, 3] + [0] * 8)
+
+    def test_update_rotated(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_rotate(True)
+        sut.set_buffer([1, 2, 4, 8, 16, 0, 0, 0, 0, 0, 3])
+        sut.update()
+        self.assertEquals(fakeI2c.write_i2c_block_data_calls[-1]["size"],
+                          [24, 0, 0, 0, 0, 0, 1, 2, 4, 8, 16, 0xff])
+
+    def test_write_string_renders_glyphs_and_blanks(self):
+        sut = IS31FL3730(FakeI2c(), {ord('a'): [1, 2], ord('b'): [4]})
+        sut.write_string('a b?', 1)
+        self.assertEquals(list(sut.buffer),
+                          [0, 1, 2, 0, 0, 0, 0, 4, 0, 0, 0, 0])
+
+    def test_render_string_is_cached_per_font(self):
+        sut = IS31FL3730(FakeI2c(), {ord('a'): [1, 2]})
+        strip = sut.render_string('aa')
+        self.assertTrue(sut.render_string('aa') is strip)
+        sut.load_font({ord('a'): [3]})
+        self.assertEquals(sut.render_string('aa'), b'\x03\x00\x03\x00')
+
+    def test_render_string_cache_is_bounded(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        for i in range(100):
+            sut.render_string(str(i))
+        self.assertTrue(len(sut._strip_cache) <= 32)
+
+    def test_batch_flushes_once(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {ord('a'): [1, 2]})
+        with sut.batch():
+            sut.write_string('a')
+            sut.graph([1, 2, 3])
+            sut.scroll()
+            sut.flush()
+            self.assertEquals(fakeI2c.write_i2c_block_data_calls, [])
+        self.assertEquals(sut.frames_sent(), 1)
+
+    def test_nested_batch_flushes_on_outer_exit(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        with sut.batch():
+            with sut.batch():
+                sut.set_col(0, 1)
+                sut.update()
+            self.assertEquals(sut.frames_sent(), 0)
+        self.assertEquals(sut.frames_sent(), 1)
+
+    def test_batch_does_not_flush_on_error(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        with self.assertRaises(ValueError):
+            with sut.batch():
+                raise ValueError()
+        self.assertEquals(sut.frames_sent(), 0)
+        sut.update()
+        self.assertEquals(sut.frames_sent(), 1)
+
+    def test_update_writes_changed_columns_then_update_register(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.update()
+        sut.set_col(3, 31)
+        sut.update()
+        calls = fakeI2c.write_i2c_block_data_calls[-2:]
+        self.assertEquals([(c["mode"], c["size"]) for c in calls],
+                          [(0x04, [31]), (0x0C, [0xff])])
+
+    def test_update_runs_changes_near_the_end_into_update_register(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.update()
+        sut.set_col(8, 1)
+        sut.set_col(10, 2)
+        sut.update()
+        call = fakeI2c.write_i2c_block_data_calls[-1]
+        self.assertEquals((call["mode"], call["size"]), (0x09, [1, 0, 2, 0xff]))
+
+    def test_partial_writes_match_full_frames(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator)
+        for x in range(40):
+            sut.set_col(x, (x * 13) % 32)
+        for _ in range(40):
+            sut.scroll()
+            self.assertEquals(simulator.frame(), bytes(sut.window))
+
 if __name__ == '__main__':
     unittest.main()
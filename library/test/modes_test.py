@@ -0,0 +1,87 @@
+import unittest
+
+from scrollphat.IS31FL3730 import (IS31FL3730, MODE_5X11, MATRIX_8X8, MATRIX_7X9,
+                                   DISPLAY_MATRIX2, DISPLAY_BOTH)
+from scrollphat.backends import SimulatorBackend
+from scrollphat.canvas import Canvas
+from is31fl3730_test import FakeI2c
+
+
+class ModesTest(unittest.TestCase):
+
+    def test_set_mode_honours_argument(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_mode(MATRIX_8X8)
+        self.assertEqual(fakeI2c.write_i2c_block_data_calls[-1]["size"], [MATRIX_8X8])
+        self.assertEqual((sut.width, sut.height), (8, 8))
+
+    def test_mode_given_to_constructor_is_written_on_open(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator, mode=MATRIX_7X9)
+        sut.update()
+        self.assertEqual(simulator.registers[0x60][0x00], MATRIX_7X9)
+        self.assertEqual(simulator.frame(), bytes(9))
+
+    def test_8x8_frame(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator, mode=MATRIX_8X8)
+        sut.set_col(7, 0x80)
+        sut.set_col(8, 0xff)
+        sut.update()
+        self.assertEqual(simulator.frame(), bytes(7) + b'\x80')
+
+    def test_8x8_partial_write_skips_unused_registers(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {}, mode=MATRIX_8X8)
+        sut.update()
+        sut.set_col(7, 1)
+        sut.update()
+        calls = [(c["mode"], c["size"]) for c in fakeI2c.write_i2c_block_data_calls[-2:]]
+        self.assertEqual(calls, [(0x08, [1]), (0x0C, [0xff])])
+
+    def test_dual_matrix_writes_matrix2_before_update(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator, mode=DISPLAY_BOTH | MATRIX_8X8)
+        self.assertEqual(sut.width, 16)
+        for x in range(16):
+            sut.set_col(x, x)
+        sut.update()
+        self.assertEqual(len(simulator.frames), 1)
+        self.assertEqual(simulator.frame(), bytes(range(16)))
+        sut.set_col(12, 0xaa)
+        sut.update()
+        self.assertEqual(simulator.frame()[12], 0xaa)
+
+    def test_matrix2_only(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator, mode=DISPLAY_MATRIX2 | MODE_5X11)
+        sut.set_col(0, 3)
+        sut.update()
+        self.assertEqual(simulator.registers[0x60][0x0E], 3)
+        self.assertEqual(simulator.frame()[0], 3)
+
+    def test_rotation_uses_matrix_height(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator, mode=MATRIX_8X8)
+        sut.set_rotate(True)
+        sut.set_col(0, 1)
+        sut.update()
+        self.assertEqual(simulator.frame()[7], 0x80)
+
+    def test_graph_uses_matrix_height(self):
+        sut = IS31FL3730(FakeI2c(), {}, mode=MATRIX_8X8)
+        sut.graph([0, 8], 0, 8)
+        self.assertEqual(list(sut.buffer[:2]), [0, 0xff])
+
+    def test_canvas_of_8x8_displays(self):
+        simulator = SimulatorBackend()
+        sut = Canvas([IS31FL3730(None, {}, bus=simulator, address=0x60, mode=MATRIX_8X8),
+                      IS31FL3730(None, {}, bus=simulator, address=0x61, mode=MATRIX_8X8)])
+        self.assertEqual(sut.width, 16)
+        sut.set_buffer(range(16))
+        sut.update()
+        self.assertEqual(bytes(simulator.registers[0x61][0x01:0x09]), bytes(range(8, 16)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.pump import FramePump
+from scrollphat.backends import SimulatorBackend
+from is31fl3730_test import FakeI2c
+
+
+class FramePumpTest(unittest.TestCase):
+
+    def test_update_is_deferred_while_pumping(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.hold()
+        sut.set_col(0, 31)
+        sut.update()
+        self.assertEqual(sut.frames_sent(), 0)
+        sut.release()
+        self.assertEqual(sut.frames_sent(), 1)
+
+    def test_pump_flushes_buffer(self):
+        simulator = SimulatorBackend()
+        sut = IS31FL3730(None, {}, bus=simulator)
+        pump = FramePump(sut, fps=200)
+        pump.start()
+        sut.set_col(4, 31)
+        sut.update()
+        time.sleep(0.05)
+        pump.stop()
+        self.assertFalse(pump.running())
+        self.assertTrue(pump.frames > 1)
+        self.assertEqual(simulator.frame()[4], 31)
+
+    def test_stop_releases_controller(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        pump = FramePump(sut, fps=200)
+        pump.start()
+        pump.stop()
+        sut.set_col(0, 1)
+        sut.update()
+        self.assertEqual(sut.window[0], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from is31fl3730_test import FakeI2c
+
+
+# Fails the next `failures` writes, then behaves
+class FlakyI2c(FakeI2c):
+    def __init__(self, failures=0):
+        FakeI2c.__init__(self)
+        self.failures = failures
+        self.attempts = 0
+
+    def write_i2c_block_data(self, addr, mode, size):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise IOError("bus error")
+        FakeI2c.write_i2c_block_data(self, addr, mode, size)
+
+
+class RecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = FlakyI2c()
+        self.sut = IS31FL3730(None, {}, bus=self.bus)
+        self.sut.set_brightness(20)
+        self.sut.set_retry(retries=2, backoff=0, holdoff=0)
+
+    def test_write_is_retried(self):
+        stats = self.sut.enable_stats()
+        self.bus.failures = 2
+        self.sut.update()
+        self.assertEqual(self.sut.frames_sent(), 1)
+        self.assertEqual(stats.retries, 2)
+        self.assertTrue(self.sut.healthy())
+
+    def test_gives_up_after_retries(self):
+        self.bus.failures = 3
+        self.sut.update()
+        self.assertEqual(self.sut.frames_sent(), 0)
+        self.assertEqual(self.sut.io_errors(), 1)
+        self.assertFalse(self.sut.healthy())
+
+    def test_holdoff_skips_updates_after_failure(self):
+        self.sut.set_retry(retries=0, holdoff=60)
+        self.bus.failures = 1
+        self.sut.update()
+        attempts = self.bus.attempts
+        self.sut.update()
+        self.assertEqual(self.bus.attempts, attempts)
+
+    def test_held_off_frames_are_counted_and_sent_later(self):
+        stats = self.sut.enable_stats()
+        self.sut.set_retry(retries=0, holdoff=0.05)
+        self.bus.failures = 1
+        self.sut.update()
+        for x in range(5):
+            self.sut.set_col(x, 1)
+            self.sut.update()
+        self.assertEqual(self.sut.frames_held_off(), 5)
+        self.assertEqual(stats.frames_held_off, 5)
+        self.assertEqual(stats.frames_skipped, 0)
+        self.assertEqual(self.sut.frames_sent(), 0)
+
+        deadline = time.time() + 2
+        while self.sut.frames_sent() == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.sut.frames_sent(), 1)
+        self.assertTrue(self.sut.healthy())
+
+    def test_repeated_failures_reinitialise(self):
+        self.sut.set_retry(retries=0, reinit_after=3, holdoff=0)
+        self.bus.failures = 3
+        for _ in range(3):
+            self.sut.update()
+        self.assertEqual(self.sut.reinit_count, 1)
+        calls = [(c["mode"], c["size"]) for c in self.bus.write_i2c_block_data_calls[-3:]]
+        self.assertEqual(calls, [(0xFF, [0x00]), (0x00, [0b00000011]), (0x19, [20])])
+        self.sut.update()
+        self.assertEqual(self.bus.write_i2c_block_data_calls[-1]["size"], [0] * 11 + [0xff])
+
+if __name__ == '__main__':
+    unittest.main()
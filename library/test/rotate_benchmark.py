@@ -0,0 +1,31 @@
+# Compares update() throughput with and without rotation
+# against the FakeI2c stub. Run from the test directory:
+#
+#   PYTHONPATH=.. python rotate_benchmark.py
+import timeit
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from is31fl3730_test import FakeI2c
+
+
+FRAMES = 20000
+
+def make_controller(rotate):
+    sut = IS31FL3730(FakeI2c(), {})
+    sut.set_rotate(rotate)
+    # a buffer whose windows all differ, so no frame is skipped
+    for x in range(FRAMES):
+        sut.set_col(x, (x * 7) % 32)
+    return sut
+
+def run(rotate):
+    sut = make_controller(rotate)
+    elapsed = min(timeit.repeat(lambda: sut.scroll(), number=FRAMES, repeat=3))
+    return FRAMES / elapsed
+
+if __name__ == '__main__':
+    plain = run(False)
+    rotated = run(True)
+    print("unrotated: {:10.0f} updates/s".format(plain))
+    print("rotated:   {:10.0f} updates/s".format(rotated))
+    print("ratio:     {:10.2f}".format(rotated / plain))
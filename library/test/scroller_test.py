@@ -0,0 +1,62 @@
+import time
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.scroller import Scroller
+from scrollphat.backends import SimulatorBackend
+from is31fl3730_test import FakeI2c
+
+
+class SlowBackend(SimulatorBackend):
+
+    def __init__(self, delay):
+        SimulatorBackend.__init__(self)
+        self.delay = delay
+
+    def write_i2c_block_data(self, address, register, data):
+        time.sleep(self.delay)
+        SimulatorBackend.write_i2c_block_data(self, address, register, data)
+
+
+class ScrollerTest(unittest.TestCase):
+
+    def test_scrolls_every_column_when_keeping_up(self):
+        sut = IS31FL3730(FakeI2c(), {ord('a'): [31, 31, 31, 31]})
+        scroller = Scroller(sut, columns_per_second=500)
+        scroller.scroll_text('aa')
+        self.assertEqual(sut.offset, 10)
+        self.assertEqual(scroller.frames + scroller.dropped, 10)
+
+    def test_slow_frames_are_dropped_not_delayed(self):
+        sut = IS31FL3730(None, {ord('a'): [31, 31, 31, 31]}, bus=SlowBackend(0.02))
+        scroller = Scroller(sut, columns_per_second=200)
+        start = time.time()
+        scroller.scroll_text('aaaa')
+        elapsed = time.time() - start
+
+        # 20 columns at 200 per second is 0.1s, plus at most a frame or two
+        self.assertTrue(elapsed < 0.3, elapsed)
+        self.assertEqual(sut.offset, 20)
+        self.assertTrue(scroller.dropped > 0)
+        self.assertEqual(scroller.frames + scroller.dropped, 20)
+        self.assertTrue(scroller.late_frames > 0)
+        self.assertTrue(scroller.max_jitter >= scroller.jitter > 0)
+
+    def test_stop(self):
+        sut = IS31FL3730(FakeI2c(), {ord('a'): [31]})
+        sut.write_string('a')
+        scroller = Scroller(sut, columns_per_second=1000)
+
+        # stop from the third update, the first being the scroll back to 0
+        updates = []
+        def update():
+            updates.append(sut.offset)
+            if len(updates) == 3:
+                scroller.stop()
+        sut.update = update
+        scroller.run()
+        self.assertEqual(scroller.stats()['frames'], 2)
+        self.assertEqual(updates[0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from scrollphat import shader
+from scrollphat.IS31FL3730 import IS31FL3730
+from is31fl3730_test import FakeI2c
+
+
+def checker(x, y):
+    return (x + y) % 2
+
+def branchy(x, y):
+    if x == 3 and y > 2:
+        return True
+    return False
+
+CHECKER = [(0b01010 if x % 2 == 0 else 0b10101) for x in range(11)]
+
+
+class RenderPixelsTest(unittest.TestCase):
+
+    def test_arithmetic_handler(self):
+        self.assertEqual(list(shader.render_pixels(checker)), CHECKER)
+
+    def test_branching_handler_falls_back(self):
+        self.assertEqual(list(shader.render_pixels(branchy)), [0, 0, 0, 0b11000] + [0] * 7)
+
+    @unittest.skipUnless(shader._get_numpy(), "requires numpy")
+    def test_scalar_result_falls_back(self):
+        calls = []
+        def handler(x, y):
+            calls.append((x, y))
+            return 1
+        self.assertEqual(list(shader.render_pixels(handler)), [31] * 11)
+        self.assertEqual(len(calls), 56)
+
+    def test_set_pixels_writes_first_eleven_columns(self):
+        fakeI2c = FakeI2c()
+        sut = IS31FL3730(fakeI2c, {})
+        sut.set_col(12, 5)
+        sut.set_pixels(checker, True)
+        self.assertEqual(list(sut.buffer), CHECKER + [0, 5])
+        self.assertEqual(fakeI2c.write_i2c_block_data_calls[-1]["size"], CHECKER + [0xff])
+
+if __name__ == '__main__':
+    unittest.main()
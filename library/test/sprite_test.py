@@ -0,0 +1,52 @@
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from scrollphat.sprite import Sprite
+from is31fl3730_test import FakeI2c
+
+
+class SpriteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = IS31FL3730(FakeI2c(), {})
+        self.sprite = Sprite([[1, 2, 4], [31, 31]])
+
+    def test_frames_are_packed(self):
+        self.assertEqual(len(self.sprite), 2)
+        self.assertEqual(self.sprite.width, 3)
+        self.assertEqual(self.sprite.frames, [b'\x01\x02\x04', b'\x1f\x1f\x00'])
+        self.assertEqual(self.sprite.mirrored[0], b'\x04\x02\x01')
+
+    def test_from_art(self):
+        sut = Sprite.from_art(['.#.', '###', '.#.'], ['#', '', '#'])
+        self.assertEqual(sut.frames, [b'\x02\x07\x02', b'\x05\x00\x00'])
+
+    def test_copy(self):
+        self.sprite.draw(self.controller, 2)
+        self.assertEqual(list(self.controller.buffer[:6]), [0, 0, 1, 2, 4, 0])
+        self.sprite.draw(self.controller, 3, mirror=True)
+        self.assertEqual(list(self.controller.buffer[:6]), [0, 0, 1, 4, 2, 1])
+
+    def test_bitwise_modes(self):
+        self.controller.set_buffer([3] * 11)
+        self.sprite.draw(self.controller, 0, mode='or')
+        self.assertEqual(list(self.controller.buffer[:4]), [3, 3, 7, 3])
+        self.sprite.draw(self.controller, 0, mode='and_not')
+        self.assertEqual(list(self.controller.buffer[:4]), [2, 1, 3, 3])
+        self.sprite.draw(self.controller, 1, frame=1, mode='xor')
+        self.assertEqual(list(self.controller.buffer[:4]), [2, 30, 28, 3])
+        with self.assertRaises(ValueError):
+            self.sprite.draw(self.controller, 0, mode='nand')
+
+    def test_clipping(self):
+        self.sprite.draw(self.controller, -2)
+        self.assertEqual(list(self.controller.buffer[:2]), [4, 0])
+        self.sprite.draw(self.controller, 10, mode='xor')
+        self.assertEqual(list(self.controller.buffer[9:]), [0, 1])
+        self.assertEqual(len(self.controller.buffer), 11)
+        self.sprite.draw(self.controller, -3)
+        self.sprite.draw(self.controller, 11)
+        self.assertEqual(list(self.controller.buffer[:2]), [4, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from scrollphat.IS31FL3730 import IS31FL3730
+from is31fl3730_test import FakeI2c
+
+
+class FailingI2c(FakeI2c):
+    def write_i2c_block_data(self, addr, mode, size):
+        if mode == 0x01:
+            raise IOError("bus error")
+        FakeI2c.write_i2c_block_data(self, addr, mode, size)
+
+
+class FrameStatsTest(unittest.TestCase):
+
+    def test_stats_are_opt_in(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.update()
+        self.assertTrue(sut.stats is None)
+
+    def test_counts_frames_and_bytes(self):
+        sut = IS31FL3730(FakeI2c(), {})
+        stats = sut.enable_stats()
+        sut.update()
+        sut.update()
+        sut.set_brightness(10)
+        result = stats.as_dict()
+        self.assertEqual(result['updates'], 2)
+        self.assertEqual(result['frames_sent'], 1)
+        self.assertEqual(result['frames_skipped'], 1)
+        # mode register, one frame, brightness
+        self.assertEqual(result['writes'], 3)
+        self.assertEqual(result['bytes_written'], 1 + 12 + 1)
+        self.assertEqual(sum(result['write_latency_histogram'].values()), 3)
+
+    def test_counts_errors_by_type(self):
+        sut = IS31FL3730(FailingI2c(), {})
+        sut.set_retry(retries=2, backoff=0)
+        stats = sut.enable_stats()
+        sut.update()
+        self.assertEqual(stats.as_dict()['errors'], {'OSError': 3})
+        self.assertEqual(stats.retries, 2)
+        self.assertEqual(stats.frames_sent, 0)
+        self.assertEqual(stats.frames_failed, 1)
+
+    def test_periodic_callback(self):
+        reports = []
+        sut = IS31FL3730(FakeI2c(), {})
+        sut.enable_stats(reports.append, interval=0)
+        sut.update()
+        sut.update()
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[-1]['updates'], 2)
+
+if __name__ == '__main__':
+    unittest.main()